@@ -0,0 +1,70 @@
+# benchmarks/bench_ann.py
+#
+# Recall@k against the exact flat index and single-query throughput for each
+# FAISS index type accepted by build_index, on the cached embeddings of every
+# collection and on synthetic scaled copies of them. Queries are perturbed
+# document vectors, so the encoder is not needed.
+#
+#   python -m benchmarks.bench_ann --k 5 --scales 1 10 100
+
+import os
+import glob
+import time
+import argparse
+import numpy as np
+
+from scripts.vector_index import parse_index_spec, create_index
+
+DEFAULT_SPECS = [
+    "flat",
+    "hnsw:M=32,efSearch=64",
+    "hnsw:M=32,efSearch=128",
+    "ivf:nlist=64,nprobe=8",
+    "ivf:nlist=64,nprobe=16",
+    "ivfpq:nlist=64,m=48,nprobe=16",
+]
+
+def scaled_embeddings(base, factor: int, rng):
+    if factor == 1:
+        return base
+    copies = [base] + [base + rng.normal(0, 0.05, base.shape).astype('float32') for _ in range(factor - 1)]
+    return np.ascontiguousarray(np.vstack(copies))
+
+def recall_at_k(approx_ids, exact_ids, k: int) -> float:
+    hits = sum(len(set(a[:k]) & set(e[:k])) for a, e in zip(approx_ids, exact_ids))
+    return hits / (k * len(exact_ids))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--specs", nargs="+", default=DEFAULT_SPECS)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'collection':<10} {'scale':>5} {'vectors':>8} {'index':<32} {'build s':>8} {'recall@k':>9} {'QPS':>9}")
+    for path in sorted(glob.glob("database/embeddings_*.npy")):
+        collection = os.path.basename(path)[len("embeddings_"):-len(".npy")]
+        base = np.load(path).astype('float32')
+        for factor in args.scales:
+            embeddings = scaled_embeddings(base, factor, rng)
+            picks = rng.choice(len(embeddings), size=min(args.queries, len(embeddings)), replace=False)
+            queries = embeddings[picks] + rng.normal(0, 0.1, (len(picks), embeddings.shape[1])).astype('float32')
+            exact_ids = None
+            for spec in args.specs:
+                kind, params = parse_index_spec(spec)
+                start = time.perf_counter()
+                index_obj = create_index(embeddings, kind, params)
+                build_s = time.perf_counter() - start
+                start = time.perf_counter()
+                found = [index_obj.search(q.reshape(1, -1), args.k)[1][0] for q in queries]
+                qps = len(queries) / (time.perf_counter() - start)
+                if exact_ids is None:
+                    # The first spec is the flat reference.
+                    exact_ids = found
+                print(f"{collection:<10} {factor:>4}x {len(embeddings):>8} {spec:<32} {build_s:>8.2f} "
+                      f"{recall_at_k(found, exact_ids, args.k):>9.3f} {qps:>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# benchmarks/bench_bm25.py
+#
+# Per-query latency of the lexical leg: overlap ratio through the inverted index
+# versus BM25 through the sparse term-document matrix (one mat-vec + argpartition),
+# at 1x, 10x and 100x the size of the current database/*.json collections.
+#
+#   python -m benchmarks.bench_bm25
+
+import time
+
+from scripts.lexical import InvertedIndex, BM25Index
+from benchmarks.common import load_collections, scale_documents, time_per_call, SAMPLE_QUERIES
+
+SCALES = [1, 10, 100]
+TOP_K = 5
+
+def main():
+    collections = load_collections()
+    print(f"{'collection':<10} {'scale':>5} {'docs':>8} {'terms':>8} {'build ms':>9} "
+          f"{'overlap p50 us':>15} {'bm25 p50 us':>12} {'bm25 p95 us':>12}")
+    for category, base_docs in collections.items():
+        for factor in SCALES:
+            doc_list = scale_documents(base_docs, factor)
+            overlap = InvertedIndex(doc_list)
+            start = time.perf_counter()
+            bm25 = BM25Index(doc_list)
+            build_ms = (time.perf_counter() - start) * 1000.0
+
+            for query in SAMPLE_QUERIES:
+                scores = bm25.score(query, top_k=TOP_K)
+                assert len(scores) <= TOP_K and all(0.0 < s <= 1.0 for s in scores.values()), query
+
+            args_list = [(query,) for query in SAMPLE_QUERIES]
+            overlap_p50, _ = time_per_call(overlap.score, args_list, repeat=5)
+            bm25_p50, bm25_p95 = time_per_call(lambda q: bm25.score(q, top_k=TOP_K), args_list, repeat=5)
+            print(f"{category:<10} {factor:>4}x {len(doc_list):>8} {len(bm25.vocabulary):>8} {build_ms:>9.1f} "
+                  f"{overlap_p50 * 1000:>15.1f} {bm25_p50 * 1000:>12.1f} {bm25_p95 * 1000:>12.1f}")
+
+if __name__ == "__main__":
+    main()
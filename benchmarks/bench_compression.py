@@ -0,0 +1,75 @@
+# benchmarks/bench_compression.py
+#
+# Memory saved versus recall@k lost by compressed embedding storage, for every
+# collection with a database/embeddings_*.npy file:
+#   - the embedding file stored as float16 (VETLLM_EMBEDDING_DTYPE) instead of
+#     float32, searched through an exact flat index;
+#   - compressed FAISS indexes (VETLLM_INDEX_SPEC): fp16, sq8, sq4 scalar
+#     quantization and pq / ivfpq product quantization.
+# Index memory is the size of the serialized index, which is what a worker holds
+# in RAM (or maps) per collection. Recall is measured against the exact float32
+# flat index, with perturbed document vectors as queries (as in bench_ann.py).
+#
+#   python -m benchmarks.bench_compression --k 5 --scale 1
+
+import os
+import io
+import glob
+import argparse
+import numpy as np
+import faiss
+
+from scripts.vector_index import parse_index_spec, create_index
+from benchmarks.bench_ann import scaled_embeddings, recall_at_k
+
+DEFAULT_SPECS = ["flat", "fp16", "sq8", "sq4", "pq:m=96", "pq:m=48", "ivfpq:nlist=64,m=48,nprobe=16"]
+
+def npy_bytes(matrix) -> int:
+    buffer = io.BytesIO()
+    np.save(buffer, matrix)
+    return buffer.tell()
+
+def index_bytes(index_obj) -> int:
+    return int(faiss.serialize_index(index_obj).nbytes)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--specs", nargs="+", default=DEFAULT_SPECS)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for collection in ("clinical", "disease", "pharma"):
+        if not os.path.exists(f"database/embeddings_{collection}.npy"):
+            print(f"Skipping {collection}: database/embeddings_{collection}.npy not found.")
+    print(f"{'collection':<10} {'storage':<34} {'MB':>8} {'saved':>7} {f'recall@{args.k}':>9}")
+    for path in sorted(glob.glob("database/embeddings_*.npy")):
+        collection = os.path.basename(path)[len("embeddings_"):-len(".npy")]
+        embeddings = scaled_embeddings(np.load(path).astype('float32'), args.scale, rng)
+        picks = rng.choice(len(embeddings), size=min(args.queries, len(embeddings)), replace=False)
+        queries = embeddings[picks] + rng.normal(0, 0.1, (len(picks), embeddings.shape[1])).astype('float32')
+
+        def report(name, size, reference_size, ids):
+            saved = 1.0 - size / reference_size
+            print(f"{collection:<10} {name:<34} {size / 1e6:>8.2f} {saved:>6.0%} "
+                  f"{recall_at_k(ids, exact_ids, args.k):>9.3f}")
+
+        exact_index = create_index(embeddings)
+        exact_ids = exact_index.search(queries, args.k)[1]
+        flat_size = index_bytes(exact_index)
+        float32_file = npy_bytes(embeddings)
+        float16 = embeddings.astype('float16')
+        report("file float32", float32_file, float32_file, exact_ids)
+        report("file float16 (flat index)", npy_bytes(float16), float32_file,
+               create_index(float16).search(queries, args.k)[1])
+
+        for spec in args.specs:
+            kind, params = parse_index_spec(spec)
+            index_obj = create_index(embeddings, kind, params)
+            report(f"index {spec}", index_bytes(index_obj), flat_size, index_obj.search(queries, args.k)[1])
+        print(f"{collection:<10} ({len(embeddings)} vectors, {embeddings.shape[1]} dimensions)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_document_store.py
+#
+# Memory held per collection and load time, before and after the columnar
+# DocumentStore:
+#   before  the list of formatted document texts the loaders used to return,
+#           plus (pharma) the raw record dicts parsed a second time by
+#           load_pharma_structured_documents for the dose rate routes
+#   after   one DocumentStore per collection, rendering texts on access
+# Memory is what stays allocated after loading (tracemalloc), load time
+# includes json.load, which is also reported on its own. "render us" is the
+# cost of rendering one document on access, paid only for returned candidates.
+#
+#   python -m benchmarks.bench_document_store
+
+import gc
+import os
+import json
+import time
+import tracemalloc
+
+from scripts.pharma import format_pharma, load_pharma_structured_documents
+from scripts.disease import DISEASE_COLUMNS, render_disease
+from scripts.clinical import clinical_fields, render_clinical
+from benchmarks.common import COLLECTION_FILES
+
+def read_records(path):
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+# The loaders as they were before the DocumentStore.
+LEGACY_LOADERS = {
+    "clinical": lambda path: [render_clinical(clinical_fields(case)) for case in read_records(path)],
+    "disease": lambda path: [render_disease({column: item.get(column, '') for column in DISEASE_COLUMNS})
+                             for item in read_records(path)],
+    "pharma": lambda path: ([format_pharma(item) for item in read_records(path)],
+                            load_pharma_structured_documents(path)),
+}
+
+def measure(load, path, repeat: int = 3):
+    """
+    Returns (the loaded object, bytes still allocated after loading, best load time in ms).
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(path)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    loaded = load(path)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return loaded, held, min(timings)
+
+def main():
+    print(f"{'collection':<10} {'docs':>6} {'json ms':>8} {'before MB':>10} {'after MB':>9} {'saved':>6} "
+          f"{'before ms':>10} {'after ms':>9} {'render us':>10}")
+    for category, (path, loader) in COLLECTION_FILES.items():
+        if not os.path.exists(path):
+            print(f"Skipping {category}: {path} not found.")
+            continue
+        _, _, json_ms = measure(read_records, path)
+        legacy, before_bytes, before_ms = measure(LEGACY_LOADERS[category], path)
+        del legacy
+        store, after_bytes, after_ms = measure(loader, path)
+        start = time.perf_counter()
+        for doc_id in range(len(store)):
+            store[doc_id]
+        render_us = (time.perf_counter() - start) * 1e6 / len(store)
+        print(f"{category:<10} {len(store):>6} {json_ms:>8.1f} {before_bytes / 1e6:>10.2f} {after_bytes / 1e6:>9.2f} "
+              f"{1.0 - after_bytes / before_bytes:>6.0%} {before_ms:>10.1f} {after_ms:>9.1f} {render_us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
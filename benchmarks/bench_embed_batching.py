@@ -0,0 +1,90 @@
+# benchmarks/bench_embed_batching.py
+#
+# Query encoding under concurrent load: every request thread calling the encoder
+# with its own query (VETLLM_EMBED_BATCHING=0) versus the EmbeddingBatcher
+# collecting them into shared forward passes. Each thread encodes distinct
+# queries back to back; reports queries/sec, per-query p50/p95 latency and the
+# batcher's batch-size and queue-wait histograms.
+#
+#   python -m benchmarks.bench_embed_batching --concurrency 1 8 32
+#   python -m benchmarks.bench_embed_batching --standin --fixed-ms 8 --per-query-ms 0.5
+#
+# --standin replaces the encoder with a model of one: a forward pass holds the
+# model for fixed-ms plus per-query-ms per text, so the benchmark runs without
+# sentence-transformers.
+
+import time
+import argparse
+import threading
+import statistics
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.embedding_batcher import EmbeddingBatcher
+from benchmarks.common import SAMPLE_QUERIES
+
+def standin_encoder(fixed_ms: float, per_query_ms: float, dimension: int = 768):
+    model_lock = threading.Lock()
+    def encode(texts):
+        with model_lock:
+            time.sleep((fixed_ms + per_query_ms * len(texts)) / 1000.0)
+        return np.zeros((len(texts), dimension), dtype='float32')
+    return encode
+
+def run(encode_one, concurrency: int, queries_per_thread: int):
+    """
+    Returns (queries/sec, p50 ms, p95 ms) with `concurrency` threads encoding distinct queries.
+    """
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def worker(thread_id):
+        samples = []
+        for i in range(queries_per_thread):
+            query = f"{SAMPLE_QUERIES[(thread_id + i) % len(SAMPLE_QUERIES)]} #{thread_id}-{i}"
+            start = time.perf_counter()
+            encode_one(query)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        with latencies_lock:
+            latencies.extend(samples)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--queries", type=int, default=20, help="queries per thread")
+    parser.add_argument("--max-wait-ms", type=float, default=3.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--standin", action="store_true")
+    parser.add_argument("--fixed-ms", type=float, default=8.0)
+    parser.add_argument("--per-query-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.standin:
+        encode_batch = standin_encoder(args.fixed_ms, args.per_query_ms)
+    else:
+        from scripts.models import get_encoder
+        encoder = get_encoder()
+        encode_batch = lambda texts: encoder.encode(texts, convert_to_numpy=True).astype('float32')
+        encode_batch(["warm-up"])
+
+    print(f"{'threads':>7} {'mode':<9} {'q/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean batch':>11} {'mean wait ms':>13}")
+    for concurrency in args.concurrency:
+        qps, p50, p95 = run(lambda query: encode_batch([query])[0], concurrency, args.queries)
+        print(f"{concurrency:>7} {'direct':<9} {qps:>8.1f} {p50:>8.2f} {p95:>8.2f}")
+        batcher = EmbeddingBatcher(encode_batch, max_wait_ms=args.max_wait_ms, max_batch=args.max_batch)
+        qps, p50, p95 = run(batcher.encode, concurrency, args.queries)
+        stats = batcher.stats()
+        print(f"{concurrency:>7} {'batched':<9} {qps:>8.1f} {p50:>8.2f} {p95:>8.2f} "
+              f"{stats['batch_size']['mean']:>11.2f} {stats['queue_wait_ms']['mean']:>13.2f}")
+    print(f"\nbatch sizes at {concurrency} threads: {stats['batch_size']['buckets']}")
+    print(f"queue wait ms at {concurrency} threads: {stats['queue_wait_ms']['buckets']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_encoder.py
+#
+# Encoder backends (VETLLM_ENCODER_BACKEND) side by side: the float32 PyTorch
+# encoder and the int8 ONNX export (python -m scripts.encoder_backends export).
+#
+# Parity: every collection is encoded with both backends and queried with the
+# router query corpus (front-end prompt templates x disease and drug names). The
+# FAISS top-k of each int8 setup is compared with the torch one:
+#   int8 queries, int8 documents    what VETLLM_ENCODER_BACKEND=onnx-int8 serves
+#   int8 queries, torch documents   int8 queries against the current embedding files
+# Speed: single-query latency (what an API request pays on a cache miss) and
+# documents/sec when encoding a collection in batches.
+#
+#   python -m benchmarks.bench_encoder --threads 4 --queries 500 --top-k 5
+
+import time
+import argparse
+import numpy as np
+
+from scripts.vector_index import create_index
+from scripts.encoder_backends import load_encoder
+from scripts.models import ENCODER_MODEL_NAME, ENCODER_ONNX_PATH, ENCODER_QUANTIZATION
+from benchmarks.common import load_collections, time_per_call
+from benchmarks.bench_router import query_corpus
+
+def encode(model, texts, batch_size: int = 32):
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True).astype('float32')
+
+def top_k(doc_embeddings, query_embeddings, k: int):
+    _, ids = create_index(doc_embeddings).search(query_embeddings, k)
+    return ids
+
+def agreement(reference, candidate):
+    """
+    Returns (top-1 agreement, mean overlap of the top-k sets) over all queries.
+    """
+    top1 = float(np.mean(reference[:, 0] == candidate[:, 0]))
+    overlap = float(np.mean([len(set(r) & set(c)) / len(r) for r, c in zip(reference, candidate)]))
+    return top1, overlap
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0: runtime default)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--quantization", default=ENCODER_QUANTIZATION)
+    args = parser.parse_args()
+
+    encoders = {}
+    for backend in ("torch", "onnx-int8"):
+        start = time.perf_counter()
+        encoders[backend] = load_encoder(ENCODER_MODEL_NAME, backend, threads=args.threads,
+                                         onnx_path=ENCODER_ONNX_PATH, quantization=args.quantization)
+        print(f"{backend}: loaded in {time.perf_counter() - start:.1f}s")
+
+    queries = query_corpus()
+    rng = np.random.default_rng(0)
+    queries = [queries[i] for i in rng.choice(len(queries), min(args.queries, len(queries)), replace=False)]
+    query_vectors = {backend: encode(model, queries, args.batch_size) for backend, model in encoders.items()}
+    cosine = np.sum(query_vectors["torch"] * query_vectors["onnx-int8"], axis=1) / (
+        np.linalg.norm(query_vectors["torch"], axis=1) * np.linalg.norm(query_vectors["onnx-int8"], axis=1))
+    print(f"\n{len(queries)} queries, torch vs int8 query embedding cosine: "
+          f"mean {cosine.mean():.4f}, min {cosine.min():.4f}")
+
+    print(f"\n{'collection':<10} {'setup':<26} {'top-1':>7} {f'overlap@{args.top_k}':>11}")
+    speed_docs = []
+    for category, docs in load_collections().items():
+        doc_vectors = {backend: encode(model, docs, args.batch_size) for backend, model in encoders.items()}
+        reference = top_k(doc_vectors["torch"], query_vectors["torch"], args.top_k)
+        setups = {
+            "int8 queries, int8 docs": top_k(doc_vectors["onnx-int8"], query_vectors["onnx-int8"], args.top_k),
+            "int8 queries, torch docs": top_k(doc_vectors["torch"], query_vectors["onnx-int8"], args.top_k),
+        }
+        for name, ids in setups.items():
+            top1, overlap = agreement(reference, ids)
+            print(f"{category:<10} {name:<26} {top1:>7.3f} {overlap:>11.3f}")
+        speed_docs.extend(docs)
+
+    print(f"\n{'backend':<10} {'query p50 ms':>13} {'query p95 ms':>13} {'docs/sec':>9}")
+    for backend, model in encoders.items():
+        p50, p95 = time_per_call(lambda query: model.encode([query], convert_to_numpy=True),
+                                 [(query,) for query in queries[:100]])
+        start = time.perf_counter()
+        encode(model, speed_docs, args.batch_size)
+        docs_per_sec = len(speed_docs) / (time.perf_counter() - start)
+        print(f"{backend:<10} {p50:>13.2f} {p95:>13.2f} {docs_per_sec:>9.1f}")
+
+if __name__ == "__main__":
+    main()
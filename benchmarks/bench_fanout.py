@@ -0,0 +1,73 @@
+# benchmarks/bench_fanout.py
+#
+# Latency of fanout_search (every collection, one shared query embedding, RRF
+# merge) next to a single-collection search and to searching the collections
+# one after another. Uses the cached database/embeddings_*.npy with flat
+# indexes; query vectors are perturbed document vectors placed in the query
+# embedding cache, so the encoder is not needed.
+#
+#   python -m benchmarks.bench_fanout --scale 10
+
+import os
+import argparse
+import numpy as np
+
+from scripts.vector_index import create_index
+from scripts.models import fanout_search, _search_collection, query_embedding_cache
+from benchmarks.common import load_collections, scale_documents, time_per_call, SAMPLE_QUERIES
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    doc_collections = {}
+    for category, base_docs in load_collections().items():
+        path = f"database/embeddings_{category}.npy"
+        if not os.path.exists(path):
+            print(f"Skipping {category}: {path} not found.")
+            continue
+        base = np.load(path).astype('float32')
+        if len(base) != len(base_docs):
+            print(f"Skipping {category}: {path} has {len(base)} rows for {len(base_docs)} documents.")
+            continue
+        embeddings = np.vstack([base] + [base + rng.normal(0, 0.05, base.shape).astype('float32')
+                                         for _ in range(args.scale - 1)])
+        doc_collections[category] = (scale_documents(base_docs, args.scale), create_index(embeddings))
+    if not doc_collections:
+        return
+
+    # Synthetic queries whose embeddings are served from the query cache.
+    queries = []
+    for i in range(args.queries):
+        docs, index_obj = list(doc_collections.values())[i % len(doc_collections)]
+        vector = index_obj.reconstruct(int(rng.integers(index_obj.ntotal)))
+        query = f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} #{i}"
+        query_embedding_cache.put(query, vector + rng.normal(0, 0.1, vector.shape).astype('float32'))
+        queries.append(query)
+
+    def search_one(query, category):
+        docs, index_obj = doc_collections[category]
+        return _search_collection(query, category, docs, index_obj, query_embedding_cache.get(query).reshape(1, -1),
+                                  3, 5, 0.5, None)
+
+    def search_sequential(query):
+        for category in doc_collections:
+            search_one(query, category)
+
+    largest = max(doc_collections, key=lambda category: len(doc_collections[category][0]))
+    rows = [
+        (f"single ({largest})", time_per_call(search_one, [(query, largest) for query in queries])),
+        ("sequential (all)", time_per_call(search_sequential, [(query,) for query in queries])),
+        ("fanout (all)", time_per_call(lambda query: fanout_search(query, doc_collections), [(query,) for query in queries])),
+    ]
+    sizes = ", ".join(f"{category}={len(docs)}" for category, (docs, _) in doc_collections.items())
+    print(f"collections: {sizes}")
+    print(f"{'search':<24} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (p50, p95) in rows:
+        print(f"{name:<24} {p50:>8.3f} {p95:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_fulltext.py
+#
+# Per-query latency of the full-text leg of hybrid_search: the original linear
+# scan with simple_fulltext_score versus the precomputed inverted index, at 1x,
+# 10x and 100x the size of the current database/*.json collections.
+#
+#   python -m benchmarks.bench_fulltext
+
+import time
+
+from scripts.lexical import simple_fulltext_score, InvertedIndex
+from benchmarks.common import load_collections, scale_documents, time_per_call, SAMPLE_QUERIES
+
+SCALES = [1, 10, 100]
+
+def linear_scan(query, doc_list):
+    scores = {}
+    for i, doc in enumerate(doc_list):
+        ft_score = simple_fulltext_score(query, doc)
+        if ft_score > 0:
+            scores[i] = ft_score
+    return scores
+
+def main():
+    collections = load_collections()
+    print(f"{'collection':<10} {'scale':>5} {'docs':>8} {'build ms':>9} "
+          f"{'scan p50':>9} {'scan p95':>9} {'index p50':>10} {'index p95':>10} {'speedup':>8}")
+    for category, base_docs in collections.items():
+        for factor in SCALES:
+            doc_list = scale_documents(base_docs, factor)
+            start = time.perf_counter()
+            index = InvertedIndex(doc_list)
+            build_ms = (time.perf_counter() - start) * 1000.0
+
+            # The scores must be identical to the linear scan.
+            for query in SAMPLE_QUERIES:
+                assert index.score(query) == linear_scan(query, doc_list), query
+
+            args_list = [(query, doc_list) for query in SAMPLE_QUERIES]
+            scan_p50, scan_p95 = time_per_call(linear_scan, args_list, repeat=1 if factor >= 100 else 3)
+            index_p50, index_p95 = time_per_call(lambda q, _docs: index.score(q), args_list, repeat=5)
+            print(f"{category:<10} {factor:>4}x {len(doc_list):>8} {build_ms:>9.1f} "
+                  f"{scan_p50:>9.3f} {scan_p95:>9.3f} {index_p50:>10.3f} {index_p95:>10.3f} "
+                  f"{scan_p50 / max(index_p50, 1e-9):>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_gemini.py
+#
+# Offline benchmark and check of the Gemini provider against the local stand-in
+# server: a new client per request (what every call used to do) versus the
+# long-lived GeminiProvider, reporting setup vs generation time per call and
+# how many TCP connections the server accepted. Also checks that the sync,
+# async and streaming paths return the stand-in's answer.
+#
+#   python -m benchmarks.bench_gemini --calls 50 --delay 0.02
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+from scripts.gemini import GeminiProvider
+from scripts.prompts import GENI_MODEL_NAME, GEMINI_GENERATION_CONFIG
+from benchmarks.gemini_standin import start_standin, standin_answer
+
+PROMPT = "You are a veterinarian. Based solely on the following clinical data, describe the prognosis."
+
+def run(provider_for_call, calls: int):
+    setups, generations = [], []
+    for _ in range(calls):
+        text, timings = provider_for_call().generate_timed(PROMPT)
+        assert text == standin_answer(PROMPT), text
+        setups.append(timings["setup_seconds"] * 1000.0)
+        generations.append(timings["generation_seconds"] * 1000.0)
+    return statistics.mean(setups), statistics.mean(generations)
+
+async def check_async(provider):
+    assert await provider.agenerate(PROMPT) == standin_answer(PROMPT)
+    chunks = [chunk async for chunk in provider.astream(PROMPT)]
+    assert "".join(chunks).strip() == standin_answer(PROMPT), chunks
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02, help="stand-in generation time in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_standin(delay=args.delay)
+    os.environ.setdefault("GEMINI_API_KEY", "stand-in")
+
+    def new_provider():
+        return GeminiProvider(GENI_MODEL_NAME, GEMINI_GENERATION_CONFIG, base_url=base_url)
+
+    shared = new_provider()
+    asyncio.run(check_async(shared))
+
+    print(f"{'mode':<18} {'calls':>6} {'setup ms':>9} {'generation ms':>14} {'total ms':>9} {'connections':>12}")
+    for mode, provider_for_call in (("client per call", new_provider), ("shared provider", lambda: shared)):
+        connections_before = server.connections
+        start = time.perf_counter()
+        setup_ms, generation_ms = run(provider_for_call, args.calls)
+        total_ms = (time.perf_counter() - start) * 1000.0 / args.calls
+        print(f"{mode:<18} {args.calls:>6} {setup_ms:>9.2f} {generation_ms:>14.2f} {total_ms:>9.2f} "
+              f"{server.connections - connections_before:>12}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_pharma_lookup.py
+#
+# Ingredient lookup for calculate_dose_rate: the original linear scan over the
+# structured pharma records versus PharmaNameIndex, on database/pharma.json and
+# on a 50k-record synthetic formulary built from it.
+#
+#   python -m benchmarks.bench_pharma_lookup
+
+import time
+import random
+
+from scripts.pharma import load_pharma_structured_documents, build_pharma_store, PharmaNameIndex, NAME_FIELDS
+from benchmarks.common import time_per_call
+
+SYNTHETIC_SIZE = 50000
+
+def linear_scan(ingredient_query, raw_docs):
+    """
+    The matching rule of the original process_pharma_dose_rate, collecting the ids of
+    every match instead of returning the first.
+    """
+    matches = []
+    query = ingredient_query.lower()
+    query_tokens = query.split()
+    for doc_id, doc in enumerate(raw_docs):
+        names = [(doc.get(field) or "").lower().strip() for field in NAME_FIELDS]
+        if len(query_tokens) == 1:
+            if any(name and name.split()[0] == query_tokens[0] for name in names):
+                matches.append(doc_id)
+        elif any(query in name for name in names):
+            matches.append(doc_id)
+    return matches
+
+def synthetic_formulary(raw_docs, size: int, seed: int = 0):
+    """
+    Returns `size` records: the real ones followed by copies whose names get a made-up
+    salt or brand word, so the vocabulary grows with the formulary.
+    """
+    rng = random.Random(seed)
+    records = list(raw_docs)
+    while len(records) < size:
+        doc = rng.choice(raw_docs)
+        tag = f"x{len(records):05d}"
+        records.append(dict(doc, **{
+            "Active Ingredient": f"{doc.get('Active Ingredient', '')} {tag}",
+            "Ingredient": doc.get("Ingredient", ""),
+            "Trade Name": f"{tag.upper()} {doc.get('Trade Name', '')}",
+        }))
+    return records
+
+def sample_queries(raw_docs, count: int = 40, seed: int = 1):
+    """
+    One-word and multi-word ingredient queries taken from real names.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for doc in rng.sample(raw_docs, count):
+        words = (doc.get("Active Ingredient") or "").lower().split()
+        if words:
+            queries.append(words[0])
+            queries.append(" ".join(words[:2]) if len(words) > 1 else words[0][1:])
+    return queries
+
+def main():
+    base_docs = load_pharma_structured_documents()
+    queries = sample_queries(base_docs)
+    print(f"{'formulary':>9} {'build ms':>9} {'scan p50':>9} {'scan p95':>9} "
+          f"{'index p50':>10} {'index p95':>10} {'speedup':>8} {'avg matches':>12}")
+    for raw_docs in (base_docs, synthetic_formulary(base_docs, SYNTHETIC_SIZE)):
+        store = build_pharma_store(raw_docs)
+        start = time.perf_counter()
+        index = PharmaNameIndex(store)
+        build_ms = (time.perf_counter() - start) * 1000.0
+
+        # Same records as the linear scan, only ranked.
+        match_counts = []
+        for query in queries:
+            expected = linear_scan(query, raw_docs)
+            found = index.lookup_ids(query)
+            assert sorted(doc_id for doc_id, _, _ in found) == expected, query
+            match_counts.append(len(found))
+
+        args_list = [(query, raw_docs) for query in queries]
+        scan_p50, scan_p95 = time_per_call(linear_scan, args_list, repeat=1 if len(raw_docs) > 1000 else 3)
+        index_p50, index_p95 = time_per_call(lambda q, _docs: index.lookup_ids(q), args_list, repeat=5)
+        print(f"{len(raw_docs):>9} {build_ms:>9.1f} {scan_p50:>9.3f} {scan_p95:>9.3f} "
+              f"{index_p50:>10.3f} {index_p95:>10.3f} {scan_p50 / max(index_p50, 1e-9):>7.1f}x "
+              f"{sum(match_counts) / len(match_counts):>12.1f}")
+
+if __name__ == "__main__":
+    main()
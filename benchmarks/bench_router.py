@@ -0,0 +1,92 @@
+# benchmarks/bench_router.py
+#
+# Category routing (VETLLM_ROUTER): checks that every router finds the same keyword
+# matches, and so the same category, as the original full en_core_web_sm pipeline
+# over a query corpus built from the front-end prompt templates and the disease and
+# drug names in database/, then compares load time and per-query latency.
+#
+#   python -m benchmarks.bench_router
+#
+# Exits with 1 if any router disagrees with the reference on any query, and with 2
+# if the reference pipeline (spaCy + en_core_web_sm) is not installed, since parity
+# can't be shown without it.
+
+import sys
+import json
+import time
+
+from scripts.router import ROUTER_MODES, get_router
+from scripts.pharma import load_pharma_structured_documents
+from benchmarks.common import time_per_call, SAMPLE_QUERIES
+
+# The prompt prefixes of vetllm-react/src/components/ChatWindow.js.
+TEMPLATES = [
+    "Return the disease synonyms for: {}",
+    "Return the diagnostic workup for: {}",
+    "What is the drug of choice for: {}",
+    "Return the differential diagnosis for: {}",
+    "Return the line of treatment for: {}",
+    "Return the prognosis for: {}",
+    "Describe the clinical signs and symptoms for: {}",
+    "Return the list of matched diseases for the symptoms: {}",
+    "Return the clinical signs and symptoms for disease: {}",
+    "Return the indications for the drug: {}",
+    "Return the contraindications for the drug: {}",
+    "Return the mechanism of action for the drug {}",
+    "Return the metabolism and elimination details for the drug: {}",
+    "Return the products for the drug: {}",
+    "calculate the dose rate of {}, 10 kg dog",
+    "{} dosage?",
+    "{} - treatment protocol / management",
+    "Brand name & tradename of {}",
+    "{}: manifestations, presentation (symptomatology)",
+]
+
+def query_corpus():
+    with open("database/disease_symptoms.json", "r") as f:
+        diseases = [record.get("Disease", "") for record in json.load(f)]
+    drugs = [doc.get("Active Ingredient", "") for doc in load_pharma_structured_documents()]
+    names = [name for name in diseases + drugs if name]
+    queries = list(SAMPLE_QUERIES) + names
+    for i, name in enumerate(names):
+        queries.append(TEMPLATES[i % len(TEMPLATES)].format(name))
+        queries.append(TEMPLATES[(i * 7 + 3) % len(TEMPLATES)].format(name).upper())
+    return queries
+
+REFERENCE_MODE = "spacy"
+
+def parity_mismatches(reference, router, queries) -> list:
+    """
+    Returns the queries on which router's keyword match counts differ from reference's.
+    """
+    return [query for query in queries if router.counts(query) != reference.counts(query)]
+
+def main() -> int:
+    queries = query_corpus()
+    print(f"{len(queries)} queries")
+    try:
+        reference = get_router(REFERENCE_MODE)
+    except (ImportError, OSError) as e:
+        print(f"Can't load the reference router ({REFERENCE_MODE}): {e}")
+        return 2
+    print(f"{'router':<10} {'load ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'mismatches':>11}")
+    failed = False
+    for mode in ROUTER_MODES:
+        start = time.perf_counter()
+        try:
+            router = get_router(mode)
+        except (ImportError, OSError) as e:
+            print(f"{mode:<10} skipped: {e}")
+            continue
+        load_ms = (time.perf_counter() - start) * 1000.0
+        mismatches = parity_mismatches(reference, router, queries)
+        failed = failed or bool(mismatches)
+        p50, p95 = time_per_call(router.route, [(query,) for query in queries])
+        print(f"{mode:<10} {load_ms:>9.1f} {p50:>8.4f} {p95:>8.4f} {len(mismatches):>11}")
+        for query in mismatches[:10]:
+            print(f"    {REFERENCE_MODE}={reference.counts(query)} {mode}={router.counts(query)}: {query}")
+    print(f"mismatches are counted against {REFERENCE_MODE} (en_core_web_sm)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
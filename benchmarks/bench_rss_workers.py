@@ -0,0 +1,76 @@
+# benchmarks/bench_rss_workers.py
+#
+# Memory per worker process with private in-RAM embeddings + IndexFlatL2 (the default)
+# versus memory-mapped embeddings and a memory-mapped serialized index
+# (VETLLM_MMAP_INDEX=1). All workers stay alive together, as under
+# `uvicorn --workers N`, and report RSS, PSS (shared pages split between the
+# processes mapping them) and anonymous (private) memory from /proc.
+#
+#   python -m benchmarks.bench_rss_workers --workers 4 --scale 100
+
+import os
+import argparse
+import tempfile
+import multiprocessing as mp
+import numpy as np
+
+from scripts.vector_index import load_or_build_index
+
+def memory_usage_mb() -> dict:
+    usage = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            field, _, value = line.partition(":")
+            if field in ("Rss", "Pss", "Anonymous"):
+                usage[field] = int(value.split()[0]) / 1024.0
+    return usage
+
+def worker(path: str, mmap: bool, results, release):
+    embeddings = np.load(path, mmap_mode='r' if mmap else None)
+    index_obj = load_or_build_index(embeddings, path, "bench", mmap=mmap)
+    # A flat search reads every vector, so all pages are resident when we measure.
+    index_obj.search(np.ascontiguousarray(embeddings[:16]), 5)
+    results.put(memory_usage_mb())
+    release.wait()
+
+def measure(path: str, mmap: bool, workers: int):
+    ctx = mp.get_context("spawn")
+    results, release = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(path, mmap, results, release)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    usages = [results.get() for _ in procs]
+    release.set()
+    for p in procs:
+        p.join()
+    return usages
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=100, help="copies of database/embeddings_pharma.npy")
+    parser.add_argument("--source", default="database/embeddings_pharma.npy")
+    args = parser.parse_args()
+
+    base = np.load(args.source).astype('float32')
+    embeddings = np.tile(base, (args.scale, 1))
+    print(f"Matrix: {embeddings.shape[0]} x {embeddings.shape[1]} float32 = {embeddings.nbytes / 2**20:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "embeddings_bench.npy")
+        np.save(path, embeddings)
+        del embeddings
+        # Serialize the index once up front so workers only measure loading.
+        load_or_build_index(np.load(path, mmap_mode='r'), path, "bench", mmap=True)
+
+        print(f"{'mode':<8} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} {'anon/worker':>12} {'total PSS':>10}")
+        for mode, mmap in (("private", False), ("mmap", True)):
+            usages = measure(path, mmap, args.workers)
+            rss = np.mean([u["Rss"] for u in usages])
+            pss = np.mean([u["Pss"] for u in usages])
+            anon = np.mean([u["Anonymous"] for u in usages])
+            print(f"{mode:<8} {args.workers:>7} {rss:>9.1f}MB {pss:>9.1f}MB {anon:>10.1f}MB "
+                  f"{pss * args.workers:>8.1f}MB")
+
+if __name__ == "__main__":
+    main()
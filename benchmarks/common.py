@@ -0,0 +1,71 @@
+# benchmarks/common.py
+#
+# Shared helpers for the micro-benchmarks. Run every benchmark from the repository
+# root (python -m benchmarks.<name>) so the relative database/ paths resolve.
+
+import os
+import time
+import statistics
+
+from scripts.clinical import load_clinical_documents
+from scripts.disease import load_disease_documents
+from scripts.pharma import load_pharma_documents
+
+COLLECTION_FILES = {
+    "clinical": ("database/clinical_data.json", load_clinical_documents),
+    "disease": ("database/disease_symptoms.json", load_disease_documents),
+    "pharma": ("database/pharma.json", load_pharma_documents),
+}
+
+SAMPLE_QUERIES = [
+    "Return the line of treatment for: canine parvovirus",
+    "Return the prognosis for: feline infectious peritonitis",
+    "Describe the clinical signs and symptoms for: canine distemper",
+    "Return the list of matched diseases for the symptoms: vomiting diarrhea lethargy",
+    "Return the indications for the drug: amoxicillin",
+    "Return the contraindications for the drug: meloxicam",
+    "Return the mechanism of action for the drug: ivermectin",
+    "dose rate of enrofloxacin in dogs",
+    "canine oral",
+    "bovine mastitis treatment protocol",
+]
+
+def load_collections():
+    """
+    Returns {category: list_of_documents} for every database file present on disk.
+    """
+    collections = {}
+    for category, (path, loader) in COLLECTION_FILES.items():
+        if os.path.exists(path):
+            collections[category] = loader(path)
+        else:
+            print(f"Skipping {category}: {path} not found.")
+    return collections
+
+def scale_documents(doc_list, factor: int):
+    """
+    Returns a synthetic copy of the collection `factor` times larger. Copies get a
+    suffix token so they are distinct strings rather than repeated references.
+    """
+    if factor == 1:
+        return list(doc_list)
+    scaled = []
+    for copy_id in range(factor):
+        for doc in doc_list:
+            scaled.append(f"{doc}\ncopy{copy_id}" if copy_id else doc)
+    return scaled
+
+def time_per_call(fn, args_list, repeat: int = 3):
+    """
+    Runs fn(*args) for every entry of args_list, `repeat` times, and returns the
+    median and p95 latency per call in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            fn(*args)
+            samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95
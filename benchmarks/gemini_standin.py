@@ -0,0 +1,95 @@
+# benchmarks/gemini_standin.py
+#
+# Local stand-in for the Gemini generateContent / streamGenerateContent REST API,
+# so the Gemini provider can be tested and benchmarked offline. Point the
+# provider at it with GEMINI_BASE_URL=http://127.0.0.1:<port> (any
+# GEMINI_API_KEY value is accepted).
+#
+#   python -m benchmarks.gemini_standin --port 8765 --delay 0.05
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def standin_answer(prompt: str) -> str:
+    return json.dumps({"answer": f"stand-in answer for a {len(prompt)} character prompt"})
+
+def _candidate(text: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+    }
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keep-alive, so clients that pool connections reuse them.
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "".join(
+            part.get("text", "") for content in request.get("contents", []) for part in content.get("parts", [])
+        )
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.delay)
+        answer = standin_answer(prompt)
+        if ":streamGenerateContent" in self.path:
+            # Split the answer into a few chunks sent as server-sent events.
+            step = max(1, len(answer) // 4)
+            chunks = [answer[i:i + step] for i in range(0, len(answer), step)]
+            body = "".join(f"data: {json.dumps(_candidate(chunk))}\r\n\r\n" for chunk in chunks).encode("utf-8")
+            content_type = "text/event-stream"
+        elif ":generateContent" in self.path:
+            body = json.dumps(_candidate(answer)).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_standin(port: int = 0, delay: float = 0.0):
+    """
+    Starts the stand-in in a daemon thread and returns (server, base_url). The server counts
+    accepted connections and requests in server.connections / server.requests.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.delay = delay
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated generation time in seconds")
+    args = parser.parse_args()
+    server, base_url = start_standin(args.port, args.delay)
+    print(f"Gemini stand-in listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,41 @@
 # scripts/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import uvicorn
+import asyncio
+import os
 import re
 import json
+import threading
+from email.utils import formatdate
 
 # Import our existing modules
 from scripts.prompts import (
     create_clinical_prompt, 
     create_disease_prompt, 
     create_pharma_prompt, 
-    get_llm_response
+    get_llm_response_async,
+    stream_llm_response,
+    cacheable_response,
+    llm_provider_stats,
+    llm_response_cache
 )
-from scripts.models import hybrid_search, build_index
-from scripts.clinical import load_clinical_documents
-from scripts.disease import load_disease_documents
-from scripts.pharma import load_pharma_documents, load_pharma_structured_documents, format_pharma
+from scripts.models import (
+    hybrid_search, hybrid_search_many, build_index, encode_query, query_embedding_cache, get_encoder,
+    reranker, RERANK_ENABLED, ENCODER_BACKEND, ENCODER_ID, embedding_batcher
+)
+from scripts.router import determine_category, get_router
+from scripts.semantic_cache import SemanticAnswerCache, query_entities
+from scripts.startup import StartupLoader
+from scripts.catalog import Catalog, build_pharma_catalog, build_disease_catalog
+from scripts.dose_rates import DoseRateTable, BASE_UNITS, SOURCE_UNITS, NO_UNIT, format_amount
+from scripts.build_embeddings import COLLECTIONS
+from scripts.pharma import PharmaNameIndex, load_pharma_documents
 
 #app = FastAPI(title="VetLLM REST API")
 app = FastAPI(title="VetLLM REST API", root_path="/api")
@@ -34,21 +52,103 @@ app.add_middleware(
 # -------------------------
 # Load Data and Build Indexes
 # -------------------------
-clinical_docs = load_clinical_documents()
-disease_docs = load_disease_documents()
-pharma_docs = load_pharma_documents()
-raw_pharma_docs = load_pharma_structured_documents()
-
-index_clinical, _ = build_index(clinical_docs, "database/embeddings_clinical.npy")
-index_disease, _ = build_index(disease_docs, "database/embeddings_disease.npy")
-index_pharma, _ = build_index(pharma_docs, "database/embeddings_pharma.npy")
-
-# Group document collections by category.
-doc_collections = {
-    "clinical": (clinical_docs, index_clinical),
-    "disease": (disease_docs, index_disease),
-    "pharma": (pharma_docs, index_pharma)
-}
+# The encoder, the spaCy router and each collection load concurrently on startup threads
+# while uvicorn already accepts connections. Routes answer 503 until the components they
+# need are ready, without Retry-After if one of them failed; /readyz reports progress. VETLLM_BACKGROUND_STARTUP=0 loads everything
+# before the app starts serving instead.
+BACKGROUND_STARTUP = os.environ.get("VETLLM_BACKGROUND_STARTUP", "1") == "1"
+
+# Document collections by category, filled in as each one finishes loading.
+doc_collections = {}
+pharma_name_index = None
+dose_rate_table = None
+
+# Embeddings are built offline (python -m scripts.build_embeddings); the API only loads them.
+# VETLLM_ENCODE_ON_STARTUP=1 lets it encode missing documents while starting up instead.
+ENCODE_ON_STARTUP = os.environ.get("VETLLM_ENCODE_ON_STARTUP", "0") == "1"
+
+# One DocumentStore per collection, shared by retrieval and the structured pharma routes.
+# Components loading concurrently wait for the first one to parse the file.
+document_stores = {}
+_document_store_locks = {}
+_document_store_locks_lock = threading.Lock()
+
+def get_document_store(category: str):
+    with _document_store_locks_lock:
+        lock = _document_store_locks.setdefault(category, threading.Lock())
+    with lock:
+        if category not in document_stores:
+            loader, _ = COLLECTIONS[category]
+            document_stores[category] = loader()
+    return document_stores[category]
+
+def load_collection(category: str):
+    _, cache_filename = COLLECTIONS[category]
+    docs = get_document_store(category)
+    index_obj, _ = build_index(docs, cache_filename, allow_encode=ENCODE_ON_STARTUP)
+    doc_collections[category] = (docs, index_obj)
+    return len(docs)
+
+def load_pharma_structured():
+    global pharma_name_index, dose_rate_table
+    store = get_document_store("pharma")
+    pharma_name_index = PharmaNameIndex(store)
+    dose_rate_table = DoseRateTable(store.column("dose_rate"))
+    return len(store)
+
+startup = StartupLoader()
+startup.register("encoder", get_encoder)
+startup.register("router", get_router)
+if RERANK_ENABLED:
+    startup.register("reranker", reranker.warm)
+for category in COLLECTIONS:
+    startup.register(category, lambda category=category: load_collection(category))
+startup.register("pharma_structured", load_pharma_structured)
+
+def pharma_catalog_store(path: str):
+    """
+    The pharma catalog is built from the DocumentStore shared with retrieval; only a rebuild
+    after pharma.json changed on disk parses the new file into a store of its own.
+    """
+    if catalog.get("pharma") is None:
+        return get_document_store("pharma")
+    return load_pharma_documents(path)
+
+# Read-only lists for the catalog routes, kept in memory and rebuilt when their file changes.
+# VETLLM_CATALOG_POLL_SECONDS=0 disables the file watcher.
+catalog = Catalog(
+    {
+        "pharma": ("database/pharma.json", build_pharma_catalog, pharma_catalog_store),
+        "diseases": ("database/clinical_data.json", build_disease_catalog),
+    },
+    poll_interval=float(os.environ.get("VETLLM_CATALOG_POLL_SECONDS", "2")),
+)
+startup.register("catalog", catalog.load)
+
+# Components each kind of request needs before it can be served.
+SEARCH_COMPONENTS = ("encoder", "router")
+
+def ensure_ready(*components):
+    """
+    Raises 503 unless the components are ready. A component whose loader failed will not
+    recover without a restart, so that 503 names the error and carries no Retry-After.
+    """
+    failed = startup.failed(*components)
+    if failed:
+        raise HTTPException(status_code=503, detail="Failed to load: " + "; ".join(
+            f"{name} ({error})" for name, error in failed.items()))
+    pending = startup.pending(*components)
+    if pending:
+        raise HTTPException(status_code=503, detail=f"Still loading: {', '.join(pending)}",
+                            headers={"Retry-After": "5"})
+
+if not BACKGROUND_STARTUP:
+    startup.start(background=False)
+
+@app.on_event("startup")
+def start_loading():
+    if BACKGROUND_STARTUP:
+        startup.start(background=True)
 
 # -------------------------
 # Request Model
@@ -57,110 +157,161 @@ class QueryRequest(BaseModel):
     query: str
     endpoint: str  # e.g., "synonym", "diagnostic_workup", etc.
     provider: str  # "Ollama" or "Gemini"
+    category: Optional[str] = None  # "clinical", "disease" or "pharma"; only used by /batch
+    rerank: Optional[bool] = None  # cross-encoder rerank of the candidates; default VETLLM_RERANK
+
+# Most candidates one /search request may ask for; each costs a FAISS neighbour and a BM25 score.
+SEARCH_MAX_TOP_K = int(os.environ.get("VETLLM_SEARCH_MAX_TOP_K", "50"))
+
+class SearchRequest(BaseModel):
+    query: str
+    collections: Optional[List[str]] = None  # default: all of "clinical", "disease", "pharma"
+    top_k: int = Field(5, ge=1, le=SEARCH_MAX_TOP_K)
+
+class DoseRateRow(BaseModel):
+    ingredient: str  # matched like the ingredient of a calculate_dose_rate query
+    species: str
+    weight: float  # kg
+
+class DoseRateBulkRequest(BaseModel):
+    rows: List[DoseRateRow]
+
+class BatchRequest(BaseModel):
+    requests: List[QueryRequest]
+    max_concurrency: Optional[int] = None  # concurrent LLM calls, capped at BATCH_MAX_CONCURRENCY
+
+# Upper bound on concurrent LLM calls made by one /batch request.
+BATCH_MAX_CONCURRENCY = int(os.environ.get("VETLLM_BATCH_CONCURRENCY", "4"))
+
+PROMPT_BUILDERS = {
+    "clinical": create_clinical_prompt,
+    "disease": create_disease_prompt,
+    "pharma": create_pharma_prompt,
+}
+
+DOSE_RATE_PATTERN = re.compile(
+    r"calculate (?:the )?dose rate of\s+(.+?)\s*(?:,|in)\s*(?:a\s*)?(\d+)\s*kg\s*(\w+)",
+    re.IGNORECASE
+)
+
+# Other matching records listed in a dose rate reference.
+DOSE_RATE_OTHER_MATCHES = 5
+
+def format_reference(candidates) -> str:
+    return "\n\n".join([f"Match {i+1}:\n{cand['text']}" for i, cand in enumerate(candidates)])
+
+# Answers reused for near-duplicate questions about the same document and sub_endpoint that
+# name the same species and numbers. Off unless VETLLM_SEMANTIC_CACHE_SIZE is set above 0.
+semantic_answer_cache = SemanticAnswerCache(
+    threshold=float(os.environ.get("VETLLM_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    max_size=int(os.environ.get("VETLLM_SEMANTIC_CACHE_SIZE", "0")),
+)
+
+def semantic_scope(category: str, sub_endpoint: str, provider: str, query: str, candidates) -> tuple:
+    return (category, sub_endpoint, int(candidates[0]["id"]), provider, query_entities(query))
+
+async def generate_answer(category: str, sub_endpoint: str, query: str, provider: str, candidates) -> str:
+    """
+    Answers a query from its best candidate, reusing the answer of a semantically
+    equivalent earlier query when there is one. The query embedding was already
+    computed by hybrid_search, so encode_query is normally a cache hit.
+    """
+    scope = semantic_scope(category, sub_endpoint, provider, query, candidates)
+    query_vector = await run_in_threadpool(encode_query, query)
+    cached = semantic_answer_cache.lookup(query_vector, scope)
+    if cached is not None:
+        return cached
+    prompt = PROMPT_BUILDERS[category](query, candidates[0]["text"], sub_endpoint)
+    response = await get_llm_response_async(prompt, provider, cache_label=f"{category}/{sub_endpoint}")
+    if cacheable_response(response):
+        semantic_answer_cache.store(query_vector, scope, response)
+    return response
 
 # -------------------------
 # Helper Function for Pharma Dose Rate Calculation
 # -------------------------
-def process_pharma_dose_rate(ingredient_query: str, weight: float, animal: str, raw_pharma_docs) -> (str, str):
-    """
-    Iterates through structured pharma documents to find an exact (or near‑exact)
-    match on the Active Ingredient, Ingredient, or Trade Name.
-    If a match is found, looks up the dose rate for the given animal type,
-    calculates the dose, and returns a response with a reference.
-    """
-    for doc in raw_pharma_docs:
-        active_ing = doc.get("Active Ingredient", "").lower().strip()
-        ing = doc.get("Ingredient", "").lower().strip()
-        trade_name = doc.get("Trade Name", "").lower().strip()
-        query_tokens = ingredient_query.lower().split()
-        # If single token, compare it to the first token of each field.
-        if len(query_tokens) == 1:
-            if (active_ing.split()[0] == query_tokens[0] or
-                ing.split()[0] == query_tokens[0] or
-                trade_name.split()[0] == query_tokens[0]):
-                dose_rate_info = doc.get("pharma_info", {}).get("dose_rate", {})
-                dose_rate_str = dose_rate_info.get(animal, None)
-                if dose_rate_str is None:
-                    return (f"No dose rate information available for {animal}.",
-                            f"Candidate:\n{format_pharma(doc)}")
-                num_match = re.search(r"([\d\.]+)", dose_rate_str)
-                if not num_match:
-                    return (f"Could not parse dose rate value for {animal}.",
-                            f"Candidate:\n{format_pharma(doc)}")
-                rate = float(num_match.group(1))
-                calculated_dose = rate * weight
-                response = (f"Calculated dose for '{doc.get('Active Ingredient')}' in a {weight} kg {animal}: "
-                            f"{calculated_dose} mg (@{rate} mg/kg).")
-                reference = f"Candidate (Exact Match):\n{format_pharma(doc)}"
-                return response, reference
-        else:
-            # For multi-word queries, use substring matching.
-            if (ingredient_query.lower() in active_ing or 
-                ingredient_query.lower() in ing or 
-                ingredient_query.lower() in trade_name):
-                dose_rate_info = doc.get("pharma_info", {}).get("dose_rate", {})
-                dose_rate_str = dose_rate_info.get(animal, None)
-                if dose_rate_str is None:
-                    return (f"No dose rate information available for {animal}.",
-                            f"Candidate:\n{format_pharma(doc)}")
-                num_match = re.search(r"([\d\.]+)", dose_rate_str)
-                if not num_match:
-                    return (f"Could not parse dose rate value for {animal}.",
-                            f"Candidate:\n{format_pharma(doc)}")
-                rate = float(num_match.group(1))
-                calculated_dose = rate * weight
-                response = (f"Calculated dose for '{doc.get('Active Ingredient')}' in a {weight} kg {animal}: "
-                            f"{calculated_dose} mg (@{rate} mg/kg).")
-                reference = f"Candidate (Exact Match):\n{format_pharma(doc)}"
-                return response, reference
-    return ("No exact match found for the specified ingredient.", "")
+def process_pharma_dose_rate(ingredient_query: str, weight: float, animal: str, name_index, dose_table) -> (str, str):
+    """
+    Looks up the records matching the ingredient on the Active Ingredient, Ingredient or
+    Trade Name (first word for a one-word query, substring otherwise) in the prebuilt
+    PharmaNameIndex. The best-ranked match with a dose rate for the given animal type is
+    used; its dose range comes from the parsed DoseRateTable, in the unit the formulary
+    gives the rate in. The other matches are listed in the reference.
+    """
+    matches = [doc_id for doc_id, _, _ in name_index.lookup_ids(ingredient_query)]
+    if not matches:
+        return ("No exact match found for the specified ingredient.", "")
+    doc_id, row = dose_table.best_row(matches, animal)
+    store = name_index.store
+    if row < 0:
+        return (f"No dose rate information available for {animal}.",
+                f"Candidate:\n{store[doc_id]}")
+    # One kg gives the rate per kg in the same unit.
+    min_dose, max_dose, units = dose_table.doses([row, row], [weight, 1.0], source=True)
+    if units[0] == NO_UNIT:
+        return (f"Could not parse dose rate value for {animal}.",
+                f"Candidate:\n{store[doc_id]}")
+    unit = SOURCE_UNITS[units[0]]
+    response = (f"Calculated dose for '{store.get(doc_id, 'Active Ingredient')}' in a {weight} kg {animal}: "
+                f"{format_amount(min_dose[0], max_dose[0])} {unit} "
+                f"(@{format_amount(min_dose[1], max_dose[1])} {unit}/kg; formulary: {dose_table.texts[row]}).")
+    reference = f"Candidate (Exact Match):\n{store[doc_id]}"
+    others = [other for other in matches if other != doc_id]
+    if others:
+        names = "\n".join(f"- {store.get(other, 'Active Ingredient')} ({store.get(other, 'Trade Name')})"
+                          for other in others[:DOSE_RATE_OTHER_MATCHES])
+        reference += f"\n\nOther matches ({len(others)}):\n{names}"
+    return response, reference
 
 # -------------------------
 # API Endpoints
 # -------------------------
 
+async def search_collection(category: str, request: QueryRequest, timings: dict):
+    # Retrieval is CPU-bound: keep it off the event loop so LLM calls keep flowing.
+    return await run_in_threadpool(hybrid_search, request.query, {category: doc_collections[category]},
+                                   rerank=request.rerank, timings=timings)
+
 # Clinical Data Endpoint
 @app.post("/clinical/{sub_endpoint}")
-def process_clinical(sub_endpoint: str, request: QueryRequest):
+async def process_clinical(sub_endpoint: str, request: QueryRequest):
     """
     Processes a clinical query.
     sub_endpoint can be one of: "synonym", "diagnostic_workup", "drug_of_choice", 
     "differential_diagnosis", "line_of_treatment", "prognosis".
     """
-    candidates = hybrid_search(request.query, {"clinical": doc_collections["clinical"]})
+    ensure_ready(*SEARCH_COMPONENTS, "clinical")
+    timings = {}
+    candidates = await search_collection("clinical", request, timings)
     if candidates:
-        best_doc = candidates[0]
-        full_text = best_doc["text"]
-        prompt = create_clinical_prompt(request.query, full_text, sub_endpoint)
-        response = get_llm_response(prompt, request.provider)
-        reference = "\n\n".join([f"Match {i+1}:\n{cand['text']}" for i, cand in enumerate(candidates)])
+        response = await generate_answer("clinical", sub_endpoint, request.query, request.provider, candidates)
+        reference = format_reference(candidates)
     else:
         response = "No relevant clinical data found."
         reference = ""
-    return {"response": response, "reference": reference}
+    return {"response": response, "reference": reference, "timings": timings}
 
 # Disease Symptoms Endpoint
 @app.post("/disease/{sub_endpoint}")
-def process_disease(sub_endpoint: str, request: QueryRequest):
+async def process_disease(sub_endpoint: str, request: QueryRequest):
     """
     Processes a disease symptoms query.
     sub_endpoint can be one of: "describe_clinical_signs", "symptoms", "reverse_symptom_lookup".
     """
-    candidates = hybrid_search(request.query, {"disease": doc_collections["disease"]})
+    ensure_ready(*SEARCH_COMPONENTS, "disease")
+    timings = {}
+    candidates = await search_collection("disease", request, timings)
     if candidates:
-        best_doc = candidates[0]
-        full_text = best_doc["text"]
-        prompt = create_disease_prompt(request.query, full_text, sub_endpoint)
-        response = get_llm_response(prompt, request.provider)
-        reference = "\n\n".join([f"Match {i+1}:\n{cand['text']}" for i, cand in enumerate(candidates)])
+        response = await generate_answer("disease", sub_endpoint, request.query, request.provider, candidates)
+        reference = format_reference(candidates)
     else:
         response = "No relevant disease data found."
         reference = ""
-    return {"response": response, "reference": reference}
+    return {"response": response, "reference": reference, "timings": timings}
 
 # Pharma Endpoint (Standard Processing)
 @app.post("/pharma/{sub_endpoint}")
-def process_pharma(sub_endpoint: str, request: QueryRequest):
+async def process_pharma(sub_endpoint: str, request: QueryRequest):
     """
     Processes a pharmaceutical query.
     sub_endpoint can be one of: "calculate_dose_rate", "indication", "contraindication",
@@ -170,86 +321,338 @@ def process_pharma(sub_endpoint: str, request: QueryRequest):
     weight, and animal type, and a dose calculation is performed.
     """
     if sub_endpoint == "calculate_dose_rate":
+        ensure_ready("pharma_structured")
         # Use a regex to extract the required values.
-        dose_rate_pattern = re.compile(
-            r"calculate (?:the )?dose rate of\s+(.+?)\s*(?:,|in)\s*(?:a\s*)?(\d+)\s*kg\s*(\w+)",
-            re.IGNORECASE
-        )
-        match_obj = dose_rate_pattern.search(request.query)
+        match_obj = DOSE_RATE_PATTERN.search(request.query)
         if match_obj:
             ingredient_query = match_obj.group(1).strip()
             weight = float(match_obj.group(2).strip())
             animal = match_obj.group(3).strip().lower()
-            response, reference = process_pharma_dose_rate(ingredient_query, weight, animal, raw_pharma_docs)
+            response, reference = await run_in_threadpool(
+                process_pharma_dose_rate, ingredient_query, weight, animal, pharma_name_index, dose_rate_table
+            )
             return {"response": response, "reference": reference}
         else:
             return {"response": "Query does not match dose rate calculation format.", "reference": ""}
     else:
-        candidates = hybrid_search(request.query, {"pharma": doc_collections["pharma"]})
+        ensure_ready(*SEARCH_COMPONENTS, "pharma")
+        timings = {}
+        candidates = await search_collection("pharma", request, timings)
         if candidates:
-            best_doc = candidates[0]
-            full_text = best_doc["text"]
-            prompt = create_pharma_prompt(request.query, full_text, sub_endpoint)
-            response = get_llm_response(prompt, request.provider)
-            reference = "\n\n".join([f"Match {i+1}:\n{cand['text']}" for i, cand in enumerate(candidates)])
+            response = await generate_answer("pharma", sub_endpoint, request.query, request.provider, candidates)
+            reference = format_reference(candidates)
         else:
             response = "No relevant pharma data found."
             reference = ""
-        return {"response": response, "reference": reference}
+        return {"response": response, "reference": reference, "timings": timings}
+
+# Bulk Dose Rate Endpoint
+@app.post("/pharma/dose_rate/bulk")
+def calculate_dose_rates_bulk(request: DoseRateBulkRequest):
+    """
+    Calculates doses for many (ingredient, species, weight) rows at once, e.g. a whole ward's
+    treatment sheets. Each ingredient is looked up once in the name index, then every dose
+    is computed in one vectorized pass over the dose rate table. Returns {"results": [...]}
+    in request order, or an error per row. min_dose and max_dose are in `unit`, the unit
+    of the formulary's dose_rate text (mcg for "1-5 mcg/kg"); base_min_dose and
+    base_max_dose give the same dose in `base_unit` (mg, mL, IU or U).
+    """
+    ensure_ready("pharma_structured")
+    matches_by_ingredient = {}
+    resolved = []
+    for item in request.rows:
+        if item.ingredient not in matches_by_ingredient:
+            matches_by_ingredient[item.ingredient] = [
+                doc_id for doc_id, _, _ in pharma_name_index.lookup_ids(item.ingredient)
+            ]
+        resolved.append(dose_rate_table.best_row(matches_by_ingredient[item.ingredient], item.species))
+    rows = [row for _, row in resolved]
+    weights = [item.weight for item in request.rows]
+    base_min_doses, base_max_doses, base_units = dose_rate_table.doses(rows, weights)
+    min_doses, max_doses, units = dose_rate_table.doses(rows, weights, source=True)
+
+    results = []
+    for item, (doc_id, row), min_dose, max_dose, unit, base_min_dose, base_max_dose, base_unit in zip(
+            request.rows, resolved, min_doses.tolist(), max_doses.tolist(), units.tolist(),
+            base_min_doses.tolist(), base_max_doses.tolist(), base_units.tolist()):
+        result = {"ingredient": item.ingredient, "species": item.species, "weight": item.weight,
+                  "matched": None, "dose_rate": None, "min_dose": None, "max_dose": None,
+                  "unit": None, "base_min_dose": None, "base_max_dose": None, "base_unit": None,
+                  "error": None}
+        if doc_id < 0:
+            result["error"] = "No match found for the specified ingredient."
+        else:
+            result["matched"] = pharma_name_index.store.get(doc_id, "Active Ingredient")
+            if row < 0:
+                result["error"] = f"No dose rate information available for {item.species}."
+            elif unit == NO_UNIT:
+                result["dose_rate"] = dose_rate_table.texts[row]
+                result["error"] = f"Could not parse dose rate value for {item.species}."
+            else:
+                result.update(dose_rate=dose_rate_table.texts[row], min_dose=min_dose,
+                              max_dose=max_dose, unit=SOURCE_UNITS[unit], base_min_dose=base_min_dose,
+                              base_max_dose=base_max_dose, base_unit=BASE_UNITS[base_unit])
+        results.append(result)
+    return {"results": results}
+
+# -------------------------
+# Streaming Endpoints (Server-Sent Events)
+# -------------------------
+# Each stream sends one "reference" event as soon as retrieval finishes, then a "token"
+# event per chunk of LLM output, then "done" (or "error" followed by "done").
+# Every data field is a JSON object: {"reference": ..., "timings": ...}, {"token": ...}, {"error": ...}.
+
+def sse_event(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def event_stream(events) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx (which serves this API under /api) from buffering the stream.
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def stream_answer(category: str, sub_endpoint: str, request: QueryRequest):
+    timings = {}
+    candidates = await search_collection(category, request, timings)
+    if not candidates:
+        yield sse_event("reference", {"reference": "", "timings": timings})
+        yield sse_event("token", {"token": f"No relevant {category} data found."})
+        yield sse_event("done", {})
+        return
+    yield sse_event("reference", {"reference": format_reference(candidates), "timings": timings})
+    scope = semantic_scope(category, sub_endpoint, request.provider, request.query, candidates)
+    query_vector = await run_in_threadpool(encode_query, request.query)
+    cached = semantic_answer_cache.lookup(query_vector, scope)
+    if cached is not None:
+        yield sse_event("token", {"token": cached})
+        yield sse_event("done", {})
+        return
+    prompt = PROMPT_BUILDERS[category](request.query, candidates[0]["text"], sub_endpoint)
+    chunks = []
+    try:
+        async for chunk in stream_llm_response(prompt, request.provider, cache_label=f"{category}/{sub_endpoint}"):
+            chunks.append(chunk)
+            yield sse_event("token", {"token": chunk})
+        response = "".join(chunks).strip()
+        if cacheable_response(response):
+            semantic_answer_cache.store(query_vector, scope, response)
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+    yield sse_event("done", {})
+
+async def stream_complete_answer(answer: dict):
+    yield sse_event("reference", {"reference": answer["reference"]})
+    yield sse_event("token", {"token": answer["response"]})
+    yield sse_event("done", {})
+
+@app.post("/clinical/{sub_endpoint}/stream")
+async def stream_clinical(sub_endpoint: str, request: QueryRequest):
+    """
+    Streaming (text/event-stream) variant of /clinical/{sub_endpoint}.
+    """
+    ensure_ready(*SEARCH_COMPONENTS, "clinical")
+    return event_stream(stream_answer("clinical", sub_endpoint, request))
+
+@app.post("/disease/{sub_endpoint}/stream")
+async def stream_disease(sub_endpoint: str, request: QueryRequest):
+    """
+    Streaming (text/event-stream) variant of /disease/{sub_endpoint}.
+    """
+    ensure_ready(*SEARCH_COMPONENTS, "disease")
+    return event_stream(stream_answer("disease", sub_endpoint, request))
+
+@app.post("/pharma/{sub_endpoint}/stream")
+async def stream_pharma(sub_endpoint: str, request: QueryRequest):
+    """
+    Streaming (text/event-stream) variant of /pharma/{sub_endpoint}. Dose rate calculations
+    don't call the LLM, so their answer is sent as a single token event.
+    """
+    if sub_endpoint == "calculate_dose_rate":
+        return event_stream(stream_complete_answer(await process_pharma(sub_endpoint, request)))
+    ensure_ready(*SEARCH_COMPONENTS, "pharma")
+    return event_stream(stream_answer("pharma", sub_endpoint, request))
+
+# -------------------------
+# Search Endpoint
+# -------------------------
+@app.post("/search")
+async def search(request: SearchRequest):
+    """
+    Retrieval only, no LLM call: searches the requested collections (all by default)
+    concurrently and returns the hits fused by reciprocal rank fusion as
+    {"results": [{"collection", "id", "text", "rrf_score", "hybrid_score", "vector_score",
+    "fulltext_score"}], "timings": {...}}.
+    """
+    categories = request.collections or list(PROMPT_BUILDERS)
+    unknown = [category for category in categories if category not in PROMPT_BUILDERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collection(s): {', '.join(unknown)}")
+    ensure_ready("encoder", *categories)
+    timings = {}
+    hits = await run_in_threadpool(
+        hybrid_search, request.query, {category: doc_collections[category] for category in categories},
+        top_k_vector=max(3, request.top_k), top_candidates=request.top_k, timings=timings, fanout=True,
+    )
+    results = [
+        {
+            "collection": hit["collection"],
+            "id": int(hit["id"]),
+            "text": hit["text"],
+            "rrf_score": float(hit["rrf_score"]),
+            "hybrid_score": float(hit["hybrid_score"]),
+            "vector_score": float(hit["vector_score"]),
+            "fulltext_score": float(hit["fulltext_score"]),
+        }
+        for hit in hits
+    ]
+    return {"results": results, "timings": timings}
+
+# -------------------------
+# Batch Endpoint
+# -------------------------
+@app.post("/batch")
+async def process_batch(batch: BatchRequest):
+    """
+    Processes many queries in one request and returns {"results": [...]} in request order,
+    each item shaped like the single-query endpoints' {"response", "reference"}.
+
+    Each item's category is taken from request.category or routed by keyword like
+    hybrid_search does, and request.endpoint is the sub_endpoint. All retrieval queries are
+    encoded in one model call with one FAISS search per collection; the LLM calls then run
+    concurrently, at most max_concurrency (capped at VETLLM_BATCH_CONCURRENCY) at a time.
+    """
+    ensure_ready(*SEARCH_COMPONENTS)
+    results = [None] * len(batch.requests)
+    search_positions = []
+    categories = await run_in_threadpool(
+        lambda: [item.category or determine_category(item.query) for item in batch.requests]
+    )
+    for i, (item, category) in enumerate(zip(batch.requests, categories)):
+        if category not in PROMPT_BUILDERS:
+            results[i] = {"response": f"Unknown category '{category}'.", "reference": ""}
+        elif category == "pharma" and item.endpoint == "calculate_dose_rate":
+            results[i] = await process_pharma("calculate_dose_rate", item)
+        else:
+            search_positions.append((i, category))
+    if search_positions:
+        ensure_ready(*{category for _, category in search_positions})
+
+    candidate_lists = await run_in_threadpool(
+        hybrid_search_many,
+        [batch.requests[i].query for i, _ in search_positions],
+        [{category: doc_collections[category]} for _, category in search_positions],
+    )
+
+    limit = asyncio.Semaphore(max(1, min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)))
+
+    async def answer(i, category, candidates):
+        item = batch.requests[i]
+        if not candidates:
+            return {"response": f"No relevant {category} data found.", "reference": ""}
+        if RERANK_ENABLED if item.rerank is None else item.rerank:
+            candidates = await run_in_threadpool(reranker.rerank, item.query, category, candidates)
+        async with limit:
+            response = await generate_answer(category, item.endpoint, item.query, item.provider, candidates)
+        return {"response": response, "reference": format_reference(candidates)}
+
+    answers = await asyncio.gather(*[
+        answer(i, category, candidates)
+        for (i, category), candidates in zip(search_positions, candidate_lists)
+    ])
+    for (i, _), result in zip(search_positions, answers):
+        results[i] = result
+    return {"results": results}
 
 # -------------------------
 # Additional Pharma Endpoints
 # -------------------------
 
+# Catalog responses carry the ETag and Last-Modified of the file they were built from;
+# "Cache-Control: no-cache" makes browsers revalidate, which costs a 304 and no body.
+
+def catalog_response(request: Request, name: str, build_payload):
+    ensure_ready("catalog")
+    entry = catalog.get(name)
+    if entry is None:
+        raise HTTPException(status_code=503, detail=f"Catalog '{name}' is unavailable: {catalog.errors.get(name)}")
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if entry.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build_payload(entry.data), headers=headers)
+
 # 1. Get the species names for a given ingredient
 @app.get("/pharma/{ingredient}/species")
-def get_species_for_ingredient(ingredient: str):
+def get_species_for_ingredient(ingredient: str, request: Request):
     """
-    Searches the structured pharma documents for an exact match on the 'Ingredient'
-    field (case-insensitive) and returns a JSON list of species (keys in the dose_rate dictionary).
+    Returns a JSON list of species (keys in the dose_rate dictionary) of the structured
+    pharma documents whose 'Ingredient' field matches exactly (case-insensitive).
     """
-    raw_docs = load_pharma_structured_documents()
-    species_set = set()
-    for doc in raw_docs:
-        doc_ingredient = doc.get("Ingredient", "").lower().strip()
-        if doc_ingredient == ingredient.lower().strip():
-            dose_rate = doc.get("pharma_info", {}).get("dose_rate", {})
-            for sp in dose_rate.keys():
-                species_set.add(sp)
-    return {"species": list(species_set)}
+    return catalog_response(request, "pharma",
+                            lambda data: {"species": data["species"].get(ingredient.lower().strip(), [])})
 
 # 2. Get all unique ingredient names from the pharma data
 @app.get("/pharma/ingredient")
-def get_all_ingredients():
+def get_all_ingredients(request: Request):
     """
     Returns all unique 'Ingredient' values from the pharma JSON.
     """
-    raw_docs = load_pharma_structured_documents()
-    ingredients = set()
-    for doc in raw_docs:
-        ing = doc.get("Ingredient", "").strip()
-        if ing:
-            ingredients.add(ing)
-    return {"ingredients": list(ingredients)}
+    return catalog_response(request, "pharma", lambda data: {"ingredients": data["ingredients"]})
 
 # -------------------------
 # New Endpoint: Get All Diseases from Clinical Data
 # -------------------------
 @app.get("/diseases")
-def get_all_diseases():
-    """
-    Reads clinical_data.json and returns a JSON list of all disease names 
-    found in the "Clinical Case" of each record.
-    """
-    with open("database/clinical_data.json", "r") as f:
-        clinical_data = json.load(f)
-    diseases = []
-    for record in clinical_data:
-        clinical_case = record.get("Clinical Case", {})
-        disease = clinical_case.get("Disease", "").strip()
-        if disease:
-            diseases.append(disease)
-    return {"diseases": diseases}
+def get_all_diseases(request: Request):
+    """
+    Returns a JSON list of all disease names found in the "Clinical Case" of each record
+    of clinical_data.json.
+    """
+    return catalog_response(request, "diseases", lambda data: {"diseases": data["diseases"]})
+
+# -------------------------
+# Health and Readiness
+# -------------------------
+@app.get("/healthz")
+def healthz():
+    """
+    Liveness: the process is up and serving requests, whether or not loading has finished.
+    """
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readyz():
+    """
+    Readiness: 200 once every component has loaded, 503 while any is loading or has failed.
+    The body lists the loading and failed components, and each component's status, load
+    time in seconds and error. Retry-After is only sent while nothing has failed.
+    """
+    status = startup.status()
+    if status["ready"]:
+        return JSONResponse(status)
+    headers = {"Retry-After": "5"} if not status["failed"] else None
+    return JSONResponse(status, status_code=503, headers=headers)
+
+# -------------------------
+# Cache Statistics
+# -------------------------
+@app.get("/stats")
+def get_stats():
+    """
+    Returns hit/miss counters for the in-process caches and queue depth per LLM provider.
+    """
+    return {
+        "encoder": {"backend": ENCODER_BACKEND, "id": ENCODER_ID},
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "llm_providers": llm_provider_stats(),
+        "llm_response_cache": llm_response_cache.stats(),
+        "semantic_answer_cache": semantic_answer_cache.stats(),
+        "catalog": catalog.stats(),
+        "reranker": reranker.stats(),
+    }
 
 # -------------------------
 # Run the API
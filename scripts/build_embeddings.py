@@ -0,0 +1,165 @@
+# scripts/build_embeddings.py
+#
+# Offline embedding build for the document collections, so the API only loads
+# finished embedding files:
+#
+#   python -m scripts.build_embeddings                      # every collection
+#   python -m scripts.build_embeddings pharma --workers 4 --batch-size 64
+#   python -m scripts.build_embeddings --index              # also write the FAISS index files
+#
+# Only documents without a cached embedding are encoded. They are split into
+# chunks that worker processes encode in batches; every finished chunk is saved
+# as a checkpoint under database/<embeddings>.chunks/, so an interrupted build
+# picks up where it stopped. The checkpoints are merged into the usual
+# embeddings_<collection>.npy (+ .meta.json), stored as VETLLM_EMBEDDING_DTYPE
+# (float32 or float16), at the end and then removed.
+# An embedding file without metadata is re-encoded; --adopt-legacy (or
+# VETLLM_ADOPT_LEGACY_EMBEDDINGS=1) adopts it as-is instead.
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import multiprocessing
+import numpy as np
+
+from scripts.clinical import load_clinical_documents
+from scripts.disease import load_disease_documents
+from scripts.pharma import load_pharma_documents
+from scripts.embedding_store import document_fingerprint, load_stored_embeddings, load_embeddings, embeddings_digest
+
+# Document loader and embedding cache file of every collection served by the API.
+COLLECTIONS = {
+    "clinical": (load_clinical_documents, "database/embeddings_clinical.npy"),
+    "disease": (load_disease_documents, "database/embeddings_disease.npy"),
+    "pharma": (load_pharma_documents, "database/embeddings_pharma.npy"),
+}
+
+def checkpoint_dir(cache_filename: str) -> str:
+    """
+    database/embeddings_pharma.npy -> database/embeddings_pharma.chunks
+    """
+    return os.path.splitext(cache_filename)[0] + ".chunks"
+
+def chunk_id(model_name: str, fingerprints) -> str:
+    return hashlib.sha1("\n".join([model_name, *fingerprints]).encode("utf-8")).hexdigest()
+
+def _init_worker(threads: int):
+    # Picked up by get_encoder when the worker loads the encoder (torch or ONNX Runtime).
+    os.environ["VETLLM_ENCODER_THREADS"] = str(threads)
+
+def _encode_chunk(task):
+    path, texts, batch_size = task
+    from scripts.models import encode_documents
+    start = time.perf_counter()
+    vectors = encode_documents(texts, batch_size=batch_size)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp_path, path)
+    return len(texts), time.perf_counter() - start
+
+def build_collection(name: str, workers: int = 1, batch_size: int = 64, chunk_size: int = 1024,
+                     threads: int = None, build_faiss_index: bool = False, adopt_legacy: bool = None):
+    from scripts.models import ENCODER_ID, ENCODER_BACKEND, EMBEDDING_DTYPE, ADOPT_LEGACY_EMBEDDINGS
+    if adopt_legacy is None:
+        adopt_legacy = ADOPT_LEGACY_EMBEDDINGS
+    adopt_legacy = adopt_legacy and ENCODER_BACKEND == "torch"
+    loader, cache_filename = COLLECTIONS[name]
+    doc_list = loader()
+    fingerprints = [document_fingerprint(doc) for doc in doc_list]
+    stored, stored_fingerprints = load_stored_embeddings(cache_filename, ENCODER_ID, len(doc_list),
+                                                         adopt_legacy=adopt_legacy)
+    if stored is not None and stored_fingerprints is None:
+        known = set(fingerprints)  # legacy cache, adopted as-is by load_embeddings
+    else:
+        known = set(stored_fingerprints or [])
+    to_encode = {}
+    for doc, fingerprint in zip(doc_list, fingerprints):
+        if fingerprint not in known and fingerprint not in to_encode:
+            to_encode[fingerprint] = doc
+
+    chunks_path = checkpoint_dir(cache_filename)
+    items = list(to_encode.items())
+    if items:
+        os.makedirs(chunks_path, exist_ok=True)
+    chunks = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        path = os.path.join(chunks_path, f"{chunk_id(ENCODER_ID, [fp for fp, _ in chunk])}.npy")
+        chunks.append((path, chunk))
+    pending = [(path, [doc for _, doc in chunk], batch_size) for path, chunk in chunks if not os.path.exists(path)]
+    print(f"{name}: {len(doc_list)} documents, {len(doc_list) - len(to_encode)} already embedded, "
+          f"{len(to_encode)} to encode in {len(chunks)} chunks ({len(chunks) - len(pending)} checkpointed).")
+
+    if pending:
+        total = sum(len(task[1]) for task in pending)
+        done = 0
+        start = time.perf_counter()
+        if workers > 1:
+            threads = threads or max(1, (os.cpu_count() or 1) // workers)
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(workers, initializer=_init_worker, initargs=(threads,)) as pool:
+                for count, _ in pool.imap_unordered(_encode_chunk, pending):
+                    done += count
+                    elapsed = time.perf_counter() - start
+                    print(f"{name}: {done}/{total} encoded, {done / elapsed:.1f} docs/sec")
+        else:
+            if threads:
+                _init_worker(threads)
+            for task in pending:
+                count, _ = _encode_chunk(task)
+                done += count
+                elapsed = time.perf_counter() - start
+                print(f"{name}: {done}/{total} encoded, {done / elapsed:.1f} docs/sec")
+        elapsed = time.perf_counter() - start
+        print(f"{name}: encoded {total} documents in {elapsed:.1f}s ({total / elapsed:.1f} docs/sec, "
+              f"{workers} worker(s), batch size {batch_size}).")
+
+    vectors = {}
+    for path, chunk in chunks:
+        for (fingerprint, _), vector in zip(chunk, np.load(path)):
+            vectors[fingerprint] = vector
+    # load_embeddings merges the new rows with the cached ones and writes the cache.
+    embeddings = load_embeddings(doc_list, cache_filename, ENCODER_ID,
+                                 lambda texts: np.stack([vectors[document_fingerprint(t)] for t in texts]),
+                                 adopt_legacy=adopt_legacy, dtype=EMBEDDING_DTYPE)
+    shutil.rmtree(chunks_path, ignore_errors=True)
+
+    if build_faiss_index:
+        from scripts.models import MMAP_INDEX, INDEX_SPEC
+        from scripts.vector_index import load_or_build_index
+        load_or_build_index(embeddings, cache_filename, embeddings_digest(cache_filename),
+                            mmap=MMAP_INDEX, index_spec=INDEX_SPEC)
+    return embeddings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-compute the embedding files of the document collections.")
+    parser.add_argument("collections", nargs="*", help=f"collections to build: {', '.join(COLLECTIONS)} (default: all)")
+    parser.add_argument("--workers", type=int, default=1, help="encoder processes")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch threads per worker (default: CPU cores / workers)")
+    parser.add_argument("--batch-size", type=int, default=64, help="documents per encoder forward pass")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="documents per checkpoint")
+    parser.add_argument("--index", action="store_true",
+                        help="also write the FAISS index files (VETLLM_INDEX_SPEC, VETLLM_MMAP_INDEX)")
+    parser.add_argument("--adopt-legacy", action="store_true", default=None,
+                        help="adopt embedding files without metadata as-is instead of re-encoding them")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.collections if name not in COLLECTIONS]
+    if unknown:
+        parser.error(f"unknown collection(s): {', '.join(unknown)}")
+    failed = []
+    for name in args.collections or list(COLLECTIONS):
+        try:
+            build_collection(name, workers=args.workers, batch_size=args.batch_size, chunk_size=args.chunk_size,
+                             threads=args.threads, build_faiss_index=args.index, adopt_legacy=args.adopt_legacy)
+        except (OSError, ValueError) as e:
+            print(f"{name}: skipped: {e}")
+            failed.append(name)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+
+def build_pharma_catalog(store) -> dict:
+    """
+    Unique Ingredient names, and the species with a dose rate for each ingredient
+    (keyed by the lower-cased ingredient name), read from the columns of the pharma
+    DocumentStore.
+    """
+    ingredients = set()
+    species = {}
+    for ingredient, dose_rate in zip(store.column("Ingredient"), store.column("dose_rate")):
+        ingredient = (ingredient or "").strip()
+        if not ingredient:
+            continue
+        ingredients.add(ingredient)
+        species.setdefault(ingredient.lower(), set()).update((dose_rate or {}).keys())
+    return {
+        "ingredients": sorted(ingredients),
+        "species": {name: sorted(names) for name, names in species.items()},
+    }
+
+def build_disease_catalog(clinical_data) -> dict:
+    """
+    Disease names from the "Clinical Case" of each clinical record, in file order.
+    """
+    diseases = []
+    for record in clinical_data:
+        disease = record.get("Clinical Case", {}).get("Disease", "").strip()
+        if disease:
+            diseases.append(disease)
+    return {"diseases": diseases}
+
+class CatalogEntry:
+    """
+    One built catalog: its data plus the validators of the file it was built from.
+    """
+    __slots__ = ("data", "etag", "last_modified", "signature")
+
+    def __init__(self, data: dict, etag: str, last_modified: float, signature: tuple):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.signature = signature
+
+    def not_modified(self, if_none_match: str = None, if_modified_since: str = None) -> bool:
+        """
+        True if a conditional request with these header values can be answered with a 304.
+        If-None-Match (a list of tags, weak ones or "*" included) takes precedence over
+        If-Modified-Since, which is compared at the one-second resolution of HTTP dates.
+        """
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+        if if_modified_since:
+            try:
+                return int(self.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+class Catalog:
+    """
+    Read-only lists served by the catalog routes, built once from their JSON files and kept
+    in memory.
+
+    sources maps a catalog name to (path, build function) or (path, build function, load
+    function): build receives load(path), or the file's parsed JSON without one. Each entry carries an ETag (hash
+    of the file contents) and Last-Modified (file mtime) for conditional requests. A watcher
+    thread polls the files' mtime and size every poll_interval seconds and rebuilds a catalog
+    whose file changed; the new entry replaces the old one in a single assignment, so
+    requests see either the old or the new catalog, never a partial one. If a rebuild fails
+    (missing file, half-written JSON), the previous entry keeps being served and the error
+    is reported by stats().
+    """
+    def __init__(self, sources: dict, poll_interval: float = 2.0):
+        self.sources = sources
+        self.poll_interval = poll_interval
+        self._entries = {}
+        self.errors = {}
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @staticmethod
+    def _signature(path: str):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _build(self, name: str):
+        path, build, *load = self.sources[name]
+        signature = self._signature(path)
+        with open(path, "rb") as f:
+            content = f.read()
+        data = build(load[0](path) if load else json.loads(content))
+        etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+        return CatalogEntry(data, etag, signature[0] / 1e9, signature)
+
+    def refresh(self) -> list:
+        """
+        Rebuilds every catalog whose file changed since it was built; returns their names.
+        """
+        rebuilt = []
+        with self._lock:
+            for name, (path, *_) in self.sources.items():
+                current = self._entries.get(name)
+                try:
+                    if current is not None and current.signature == self._signature(path):
+                        continue
+                    entry = self._build(name)
+                except (OSError, ValueError) as e:
+                    if self.errors.get(name) is None:
+                        print(f"Catalog {name}: could not build from {path}: {e}")
+                    self.errors[name] = f"{type(e).__name__}: {e}"
+                    continue
+                self._entries = dict(self._entries, **{name: entry})
+                self.errors[name] = None
+                if current is not None:
+                    self.reloads += 1
+                    print(f"Catalog {name}: reloaded from {path}")
+                rebuilt.append(name)
+        return rebuilt
+
+    def load(self) -> list:
+        """
+        Builds every catalog and starts the file watcher (unless poll_interval is 0).
+        """
+        rebuilt = self.refresh()
+        if self.poll_interval > 0 and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+            self._watcher.start()
+        return rebuilt
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.refresh()
+
+    def get(self, name: str):
+        """
+        Returns the CatalogEntry for name, or None if it has never been built.
+        """
+        return self._entries.get(name)
+
+    def stats(self) -> dict:
+        entries = self._entries
+        return {
+            "poll_interval": self.poll_interval,
+            "reloads": self.reloads,
+            "catalogs": {
+                name: {
+                    "path": path,
+                    "etag": entries[name].etag if name in entries else None,
+                    "last_modified": entries[name].last_modified if name in entries else None,
+                    "error": self.errors.get(name),
+                }
+                for name, (path, *_) in self.sources.items()
+            },
+        }
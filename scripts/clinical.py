@@ -1,28 +1,44 @@
 import os
 import json
 
-def load_clinical_documents(database_path="database/clinical_data.json"):
-    with open(database_path, 'r') as f:
-        clinical_data = json.load(f)
+from scripts.document_store import DocumentStore
+
+CLINICAL_COLUMNS = (
+    "Disease", "Synonyms", "Clinical Examination", "Diagnostic Workup", "Diagnosis", "Drug of Choice",
+    "Differential Diagnosis", "Line of Treatment", "Prognosis", "Client Education & Prevention",
+)
+# Fields rendered only when the record has them; None in the store means absent.
+CLINICAL_OPTIONAL_COLUMNS = ("Drug of Choice", "Differential Diagnosis")
+
+def clinical_fields(case) -> dict:
+    clinical_case = case.get("Clinical Case", {})
+    generated_data = case.get("Generated Exam Data", {})
+    fields = {
+        "Disease": clinical_case.get('Disease', ''),
+        "Synonyms": clinical_case.get('Synonyms', ''),
+    }
+    for column in ("Clinical Examination", "Diagnostic Workup", "Line of Treatment"):
+        fields[column] = generated_data.get(column, {})
+    for column in ("Diagnosis", "Prognosis", "Client Education & Prevention"):
+        fields[column] = generated_data.get(column, '')
+    for column in CLINICAL_OPTIONAL_COLUMNS:
+        fields[column] = generated_data.get(column)
+    return fields
+
+def render_clinical(fields) -> str:
+    exam_details = "\n".join([f"{key}: {value}" for key, value in fields["Clinical Examination"].items()])
+    diagnostic_details = "\n".join([f"{key}: {value}" for key, value in fields["Diagnostic Workup"].items()])
+    treatment_details = "\n".join([f"{key}: {value}" for key, value in fields["Line of Treatment"].items()])
     
-    documents = []
-    for case in clinical_data:
-        clinical_case = case.get("Clinical Case", {})
-        generated_data = case.get("Generated Exam Data", {})
-        exam_details = "\n".join([f"{key}: {value}" for key, value in generated_data.get("Clinical Examination", {}).items()])
-        diagnostic_details = "\n".join([f"{key}: {value}" for key, value in generated_data.get("Diagnostic Workup", {}).items()])
-        treatment_details = "\n".join([f"{key}: {value}" for key, value in generated_data.get("Line of Treatment", {}).items()])
-        
-        # Include extra keys if available
-        other_details = ""
-        if "Drug of Choice" in generated_data:
-            other_details += f"Drug of Choice: {generated_data.get('Drug of Choice', '')}\n"
-        if "Differential Diagnosis" in generated_data:
-            other_details += f"Differential Diagnosis: {generated_data.get('Differential Diagnosis', '')}\n"
-        
-        context = f"""
-Disease: {clinical_case.get('Disease', '')}
-Synonyms: {clinical_case.get('Synonyms', '')}
+    # Include extra keys if available
+    other_details = ""
+    for column in CLINICAL_OPTIONAL_COLUMNS:
+        if fields[column] is not None:
+            other_details += f"{column}: {fields[column]}\n"
+    
+    context = f"""
+Disease: {fields['Disease']}
+Synonyms: {fields['Synonyms']}
 
 Clinical Examination:
 {exam_details}
@@ -30,14 +46,18 @@ Clinical Examination:
 Diagnostic Workup:
 {diagnostic_details}
 
-Diagnosis: {generated_data.get('Diagnosis', '')}
+Diagnosis: {fields['Diagnosis']}
 
 {other_details}
 Line of Treatment:
 {treatment_details}
 
-Prognosis: {generated_data.get('Prognosis', '')}
-Client Education & Prevention: {generated_data.get('Client Education & Prevention', '')}
+Prognosis: {fields['Prognosis']}
+Client Education & Prevention: {fields['Client Education & Prevention']}
         """
-        documents.append(context.strip())
-    return documents
+    return context.strip()
+
+def load_clinical_documents(database_path="database/clinical_data.json") -> DocumentStore:
+    with open(database_path, 'r') as f:
+        clinical_data = json.load(f)
+    return DocumentStore(CLINICAL_COLUMNS, (clinical_fields(case) for case in clinical_data), render_clinical)
@@ -1,24 +1,24 @@
 import os
 import json
 
-def load_disease_documents(database_path="database/disease_symptoms.json"):
+from scripts.document_store import DocumentStore
+
+DISEASE_COLUMNS = ("Disease", "Symptoms", "Clinical_Signs")
+
+def render_disease(fields) -> str:
+    return (
+        f"Disease: {fields['Disease']}\n"
+        f"Symptoms: {fields['Symptoms']}\n"
+        f"Clinical Signs: {fields['Clinical_Signs']}"
+    )
+
+def load_disease_documents(database_path="database/disease_symptoms.json") -> DocumentStore:
     with open(database_path, 'r') as f:
         disease_symptoms = json.load(f)
     
-    documents = []
-    if isinstance(disease_symptoms, list):
-        for item in disease_symptoms:
-            text = (
-                f"Disease: {item.get('Disease', '')}\n"
-                f"Symptoms: {item.get('Symptoms', '')}\n"
-                f"Clinical Signs: {item.get('Clinical_Signs', '')}"
-            )
-            documents.append(text)
-    else:
-        text = (
-            f"Disease: {disease_symptoms.get('Disease', '')}\n"
-            f"Symptoms: {disease_symptoms.get('Symptoms', '')}\n"
-            f"Clinical Signs: {disease_symptoms.get('Clinical_Signs', '')}"
-        )
-        documents.append(text)
-    return documents
+    records = disease_symptoms if isinstance(disease_symptoms, list) else [disease_symptoms]
+    return DocumentStore(
+        DISEASE_COLUMNS,
+        ({column: item.get(column, '') for column in DISEASE_COLUMNS} for item in records),
+        render_disease,
+    )
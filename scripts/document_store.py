@@ -0,0 +1,58 @@
+def intern_value(value, pool: dict):
+    """
+    Interns every string in a JSON value (nested dict keys and values, list items) in pool,
+    so a repeated field value or species name is stored once. A per-store pool rather than
+    sys.intern: most field values are unique paragraphs, and the interpreter's intern table
+    would keep growing for them without sharing anything.
+    """
+    if isinstance(value, str):
+        return pool.setdefault(value, value)
+    if isinstance(value, dict):
+        return {intern_value(key, pool): intern_value(item, pool) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern_value(item, pool) for item in value]
+    return value
+
+class DocumentStore:
+    """
+    One collection held column by column: a tuple of (interned) values per field, instead of
+    a dict per record plus a formatted text blob per record.
+
+    The store reads like the list of document texts it replaces: store[doc_id] renders the
+    text of one record with render(row) on demand, iterating renders them one at a time,
+    and len(store) is the number of records. Structured callers read fields directly with
+    get(doc_id, column), column(name) or row(doc_id).
+    """
+    def __init__(self, columns, records, render):
+        """
+        columns: field names kept; records: flat dicts with at least those keys;
+        render: function of a row dict returning the document text.
+        """
+        self.columns = tuple(columns)
+        self.render = render
+        values = [[] for _ in self.columns]
+        pool = {}
+        for record in records:
+            for column_values, column in zip(values, self.columns):
+                column_values.append(intern_value(record[column], pool))
+        self._data = {column: tuple(column_values) for column, column_values in zip(self.columns, values)}
+        self._size = len(values[0]) if values else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, doc_id) -> str:
+        return self.render(self.row(doc_id))
+
+    def __iter__(self):
+        for doc_id in range(self._size):
+            yield self[doc_id]
+
+    def column(self, name: str) -> tuple:
+        return self._data[name]
+
+    def get(self, doc_id, name: str):
+        return self._data[name][doc_id]
+
+    def row(self, doc_id) -> dict:
+        return {column: values[doc_id] for column, values in self._data.items()}
@@ -0,0 +1,170 @@
+"""
+Dose rates of the pharma formulary, parsed once from their free text into a NumPy table.
+
+Every parsed dose is stored in the base unit of its kind (DOSE_UNITS): mass in mg
+(1 g = 1000 mg, 1 mcg/µg/ug = 0.001 mg), volume in mL (1 L = 1000 mL), while IU and U are
+kept as they are, so doses of different rows can be compared. Each row also keeps the
+amounts and unit as written (SOURCE_UNITS), and the dose calculation routes report doses
+in that unit with DoseRateTable.doses(..., source=True): "1-5 mcg/kg" gives a dose in
+mcg, never a 1000 times smaller number of mg. The original text stays available in
+DoseRateTable.texts.
+"""
+import re
+import numpy as np
+
+# Dose units per kg of body weight by spelling: (unit as reported, base unit, factor to
+# the base unit).
+DOSE_UNITS = {
+    "g": ("g", "mg", 1000.0),
+    "mg": ("mg", "mg", 1.0),
+    "mcg": ("mcg", "mg", 0.001),
+    "µg": ("mcg", "mg", 0.001),
+    "ug": ("mcg", "mg", 0.001),
+    "l": ("L", "mL", 1000.0),
+    "ml": ("mL", "mL", 1.0),
+    "iu": ("IU", "IU", 1.0),
+    "u": ("U", "U", 1.0),
+}
+BASE_UNITS = ["mg", "mL", "IU", "U"]
+SOURCE_UNITS = ["g", "mg", "mcg", "L", "mL", "IU", "U"]
+NO_UNIT = -1
+
+def format_number(value: float) -> str:
+    """
+    Fixed-point with at most 6 decimals and no trailing zeros, never an exponent:
+    1.5e7 -> "15000000", 0.05 -> "0.05", 0.1 * 3 -> "0.3", 5.0 -> "5".
+    """
+    return np.format_float_positional(value, precision=6, unique=False, trim='-')
+
+def format_amount(low: float, high: float) -> str:
+    """
+    5.0, 5.0 -> "5"; 5.0, 10.0 -> "5-10".
+    """
+    return format_number(low) if low == high else f"{format_number(low)}-{format_number(high)}"
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?|\.\d+"
+DOSE_RATE_PATTERN = re.compile(
+    rf"(?P<min>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<max>{_NUMBER}))?\s*"
+    rf"(?P<unit>{'|'.join(sorted(DOSE_UNITS, key=len, reverse=True))})\s*/\s*kg\b",
+    re.IGNORECASE,
+)
+
+DOSE_TABLE_DTYPE = np.dtype([
+    ("ingredient", np.int32),  # record position in the structured pharma documents
+    ("species", np.int16),     # position in DoseRateTable.species
+    ("min", np.float64),       # per kg, in the base unit; NaN if the text could not be parsed
+    ("max", np.float64),
+    ("unit", np.int8),         # position in BASE_UNITS, or NO_UNIT
+    ("source_min", np.float64),  # per kg, as written in the text; NaN if unparsed
+    ("source_max", np.float64),
+    ("source_unit", np.int8),  # position in SOURCE_UNITS of the unit in the text, or NO_UNIT
+])
+
+def normalize_species(species: str) -> str:
+    """
+    "Dogs" -> "dog"; the formulary uses both singular and plural species keys.
+    """
+    species = species.lower().strip()
+    if len(species) > 3 and species.endswith("s") and not species.endswith("ss"):
+        species = species[:-1]
+    return species
+
+def parse_dose_rate(dose_rate_str: str):
+    """
+    Parses free-text dose rates such as "5-10 mg/kg", "0.5 mg/kg every 12 hours",
+    "10,000 - 20,000 IU/kg" or "50-100 mcg/kg" into (min, max, base unit) per kg,
+    converted to the base unit of DOSE_UNITS. Returns None for anything that is not a
+    per-kg dose ("Not applicable", "2% solution", "1-2 mg/L").
+    """
+    parsed = parse_source_dose_rate(dose_rate_str)
+    if parsed is None:
+        return None
+    low, high, source_unit = parsed
+    _, unit, factor = DOSE_UNITS[source_unit.lower()]
+    return low * factor, high * factor, unit
+
+def parse_source_dose_rate(dose_rate_str: str):
+    """
+    parse_dose_rate() without the conversion: (min, max, unit) per kg as written, with the
+    unit spelled as in SOURCE_UNITS ("50-100 µg/kg" -> (50.0, 100.0, "mcg")).
+    """
+    match = DOSE_RATE_PATTERN.search(dose_rate_str or "")
+    if not match:
+        return None
+    source_unit = DOSE_UNITS[match.group("unit").lower()][0]
+    low = float(match.group("min").replace(",", ""))
+    high = float(match.group("max").replace(",", "")) if match.group("max") else low
+    return min(low, high), max(low, high), source_unit
+
+class DoseRateTable:
+    """
+    The dose_rate maps ({species: dose rate text}) of every pharma record, e.g. the
+    "dose_rate" column of the pharma DocumentStore, parsed once into a NumPy table with
+    one row per (record, species): see DOSE_TABLE_DTYPE. Rows whose text
+    could not be parsed are kept with NaN doses so callers can tell "unparseable" from
+    "no dose rate for this species".
+    """
+    def __init__(self, dose_rates):
+        self.species = []
+        species_ids = {}
+        rows = []
+        self.texts = []
+        for doc_id, dose_rate in enumerate(dose_rates):
+            for species, dose_rate_str in (dose_rate or {}).items():
+                name = normalize_species(species)
+                if name not in species_ids:
+                    species_ids[name] = len(self.species)
+                    self.species.append(name)
+                parsed = parse_source_dose_rate(str(dose_rate_str))
+                if parsed is None:
+                    rows.append((doc_id, species_ids[name], np.nan, np.nan, NO_UNIT, np.nan, np.nan, NO_UNIT))
+                else:
+                    low, high, source_unit = parsed
+                    _, unit, factor = DOSE_UNITS[source_unit.lower()]
+                    rows.append((doc_id, species_ids[name], low * factor, high * factor, BASE_UNITS.index(unit),
+                                 low, high, SOURCE_UNITS.index(source_unit)))
+                self.texts.append(str(dose_rate_str))
+        self.table = np.array(rows, dtype=DOSE_TABLE_DTYPE)
+        self.species_ids = species_ids
+        # (record, species) -> row; the first entry wins if a record lists a species twice.
+        self.row_index = {}
+        for row, (doc_id, species_id) in enumerate(zip(self.table["ingredient"].tolist(),
+                                                       self.table["species"].tolist())):
+            self.row_index.setdefault((doc_id, species_id), row)
+
+    def row(self, doc_id: int, species: str) -> int:
+        """
+        Returns the table row for a record and species, or -1.
+        """
+        species_id = self.species_ids.get(normalize_species(species))
+        if species_id is None:
+            return -1
+        return self.row_index.get((doc_id, species_id), -1)
+
+    def best_row(self, doc_ids, species: str):
+        """
+        Returns (doc_id, row) for the first of the ranked doc_ids with a dose rate for the
+        species, or (first doc_id, -1) if none has one.
+        """
+        for doc_id in doc_ids:
+            row = self.row(doc_id, species)
+            if row >= 0:
+                return doc_id, row
+        return (doc_ids[0] if doc_ids else -1), -1
+
+    def doses(self, rows, weights, source: bool = False):
+        """
+        Vectorized dose calculation: returns (min_dose, max_dose, unit ids) for the given
+        table rows and body weights in kg, in base units (ids into BASE_UNITS), or with
+        source=True in the unit each row's text was written in (ids into SOURCE_UNITS, so
+        "1-5 mcg/kg" gives mcg). Rows of -1 give NaN doses and NO_UNIT.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        found = rows >= 0
+        selected = self.table[np.where(found, rows, 0)] if len(self.table) else np.zeros(len(rows), DOSE_TABLE_DTYPE)
+        prefix = "source_" if source else ""
+        min_dose = np.where(found, selected[prefix + "min"] * weights, np.nan)
+        max_dose = np.where(found, selected[prefix + "max"] * weights, np.nan)
+        units = np.where(found, selected[prefix + "unit"], NO_UNIT)
+        return min_dose, max_dose, units
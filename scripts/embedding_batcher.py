@@ -0,0 +1,129 @@
+import time
+import queue
+import bisect
+import threading
+from concurrent.futures import Future
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+class Histogram:
+    """
+    Counts of observations per bucket; an observation goes to the first bucket whose
+    upper bound it does not exceed, or to the overflow bucket.
+    """
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.observations += 1
+
+    def snapshot(self) -> dict:
+        buckets = {f"<={bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]:g}"] = self.counts[-1]
+        return {
+            "buckets": buckets,
+            "count": self.observations,
+            "mean": self.total / self.observations if self.observations else 0.0,
+        }
+
+class EmbeddingBatcher:
+    """
+    Collects query texts submitted by concurrent request threads and encodes them together,
+    so N simultaneous cache misses cost one forward pass instead of N contending ones.
+
+    A single worker thread takes the first queued query, then keeps collecting until
+    max_batch queries are gathered or max_wait_ms has passed, and resolves every caller's
+    future from one encode_fn(texts) call. Identical texts in a batch are encoded once.
+    The window is only waited out while requests are arriving concurrently (the previous
+    batch held more than one query, or more are already queued); an isolated request is
+    encoded as soon as the worker picks it up, so single-request latency is unchanged.
+
+    stats() reports histograms of batch sizes and of the time queries spent queued.
+    """
+    def __init__(self, encode_fn, max_wait_ms: float = 3.0, max_batch: int = 32):
+        self.encode_fn = encode_fn
+        self.max_wait_ms = max_wait_ms
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._last_batch_size = 0
+        self._lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.batches = 0
+        self.errors = 0
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queues text for encoding; the future resolves to its float32 embedding.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str):
+        return self.submit(text).result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        linger = self._last_batch_size > 1 or not self._queue.empty()
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch:
+            try:
+                if linger:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.perf_counter())))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.encode_fn(texts)))
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._last_batch_size = len(batch)
+                with self._lock:
+                    self.batches += 1
+                    self.batch_sizes.observe(len(batch))
+                    for _, _, enqueued in batch:
+                        self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+            for text, future, _ in batch:
+                future.set_result(vectors[text])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_wait_ms": self.max_wait_ms,
+                "max_batch": self.max_batch,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "errors": self.errors,
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            }
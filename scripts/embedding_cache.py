@@ -0,0 +1,95 @@
+import os
+import atexit
+import threading
+from collections import OrderedDict
+import numpy as np
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of query embeddings.
+
+    Keys are the query text with surrounding and repeated whitespace collapsed; case is kept
+    because it is the encoder's tokenizer, not the cache, that decides whether case matters.
+    When persist_path is set, the cache is loaded from that .npz file at start-up (if it was
+    written for the same model) and saved back on save() and at interpreter exit, so a
+    restarted worker starts warm.
+    """
+    def __init__(self, max_size: int = 1024, persist_path: str = None, model_name: str = ""):
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.split())
+
+    def get(self, query: str):
+        key = self.normalize(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector):
+        if self.max_size <= 0:
+            return
+        vector = np.array(vector, dtype='float32').reshape(-1)
+        vector.setflags(write=False)
+        key = self.normalize(query)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self):
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            keys = np.array(list(self._entries.keys()))
+            vectors = np.stack(list(self._entries.values()))
+        tmp_path = f"{self.persist_path}.tmp.npz"
+        np.savez(tmp_path, keys=keys, vectors=vectors, model_name=np.array(self.model_name))
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with np.load(self.persist_path) as data:
+                if str(data["model_name"]) != self.model_name:
+                    print(f"Ignoring query embedding cache {self.persist_path}: built for another model.")
+                    return
+                keys, vectors = data["keys"], data["vectors"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not load query embedding cache {self.persist_path}: {e}")
+            return
+        if self.max_size <= 0:
+            return
+        for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+            self.put(str(key), vector)
+        print(f"Loaded {len(self._entries)} cached query embeddings from {self.persist_path}.")
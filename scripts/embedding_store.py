@@ -0,0 +1,170 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+# On-disk precision of the embedding matrix. float16 halves the file (and the memory map)
+# at a precision loss far below what changes a nearest-neighbour ranking.
+EMBEDDING_DTYPES = ("float32", "float16")
+
+def document_fingerprint(doc: str) -> str:
+    return hashlib.sha1(doc.encode("utf-8")).hexdigest()
+
+def metadata_path(cache_filename: str) -> str:
+    """
+    database/embeddings_pharma.npy -> database/embeddings_pharma.meta.json
+    """
+    return os.path.splitext(cache_filename)[0] + ".meta.json"
+
+def read_metadata(cache_filename: str):
+    path = metadata_path(cache_filename)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable embedding metadata {path}: {e}")
+        return None
+
+def embeddings_digest(cache_filename: str) -> str:
+    """
+    Digest of the metadata (model plus per-row fingerprints), identifying the exact
+    contents of the cached matrix. Used to tell whether a serialized index is current.
+    A matrix without metadata (served as-is, see load_embeddings) is identified by the
+    contents of the .npy file itself.
+    """
+    path = metadata_path(cache_filename)
+    if not os.path.exists(path):
+        path = cache_filename
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def save_embeddings(cache_filename: str, embeddings, fingerprints, model_name: str, dtype: str = "float32"):
+    """
+    Writes the matrix, stored as dtype, and its metadata (encoder model, dtype and one
+    fingerprint per row) via temporary files and os.replace so readers never see a
+    half-written cache.
+    """
+    tmp_matrix = f"{cache_filename}.tmp"
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, np.asarray(embeddings).astype(dtype, copy=False))
+    meta_file = metadata_path(cache_filename)
+    tmp_meta = f"{meta_file}.tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump({"model": model_name, "dtype": dtype, "fingerprints": list(fingerprints)}, f)
+    os.replace(tmp_matrix, cache_filename)
+    os.replace(tmp_meta, meta_file)
+
+def load_stored_embeddings(cache_filename: str, model_name: str, num_docs: int, mmap: bool = False,
+                           adopt_legacy: bool = False):
+    """
+    Returns (matrix, fingerprints) for a usable cache, or (None, None).
+    A cache written before fingerprints were recorded says nothing about which text or
+    encoder each row came from, so it is re-encoded. Only with adopt_legacy=True is it
+    adopted positionally (when its row count matches the collection); that trusts every
+    row to still match its document, so it is an explicit opt-in for a one-off migration.
+    With mmap=True the matrix is a read-only memory map shared with other processes.
+    """
+    if not os.path.exists(cache_filename):
+        return None, None
+    stored = np.load(cache_filename, mmap_mode='r' if mmap else None)
+    meta = read_metadata(cache_filename)
+    if meta is None:
+        if not adopt_legacy:
+            print(f"{cache_filename} has no metadata, so its rows can't be matched to documents "
+                  f"(VETLLM_ADOPT_LEGACY_EMBEDDINGS=1 adopts it as-is).")
+            return None, None
+        if len(stored) == num_docs:
+            print(f"{cache_filename} has no fingerprints; adopting it as-is "
+                  f"(delete it to force a full re-encode).")
+            return stored, None
+        print(f"{cache_filename} has no fingerprints and {len(stored)} rows for {num_docs} documents; re-encoding.")
+        return None, None
+    if meta.get("model") != model_name:
+        print(f"{cache_filename} was built with {meta.get('model')}, not {model_name}; re-encoding.")
+        return None, None
+    fingerprints = meta.get("fingerprints", [])
+    if stored.dtype != np.dtype(meta.get("dtype", "float32")):
+        print(f"{cache_filename} is {stored.dtype}, its metadata says {meta.get('dtype', 'float32')}; re-encoding.")
+        return None, None
+    if len(fingerprints) != len(stored):
+        print(f"{cache_filename} does not match its metadata; re-encoding.")
+        return None, None
+    return stored, fingerprints
+
+def load_embeddings(doc_list, cache_filename: str, model_name: str, encode_fn, mmap: bool = False,
+                    allow_encode: bool = True, adopt_legacy: bool = False, dtype: str = "float32"):
+    """
+    Returns the embedding matrix for doc_list, one row per document, stored and returned as
+    dtype (one of EMBEDDING_DTYPES). A cache in the other dtype is converted, not re-encoded.
+
+    Each document is fingerprinted by a hash of its text. Rows whose fingerprint is already
+    in the cache are reused, only new or edited documents are passed to encode_fn, removed
+    documents are dropped, and the cache is rewritten only if anything changed.
+    With mmap=True the returned matrix is a read-only memory map of the cache file, so
+    worker processes serving the same file share its physical pages.
+    With allow_encode=False nothing is encoded: a RuntimeError is raised if any document
+    lacks a cached embedding (build them with `python -m scripts.build_embeddings`). A
+    cache without metadata whose row count matches the collection is then served as-is
+    with a warning, but never rewritten or certified: the next build re-encodes it.
+    """
+    if not doc_list:
+        raise ValueError(f"No documents to embed for {cache_filename}.")
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}'. Expected one of: {', '.join(EMBEDDING_DTYPES)}.")
+    fingerprints = [document_fingerprint(doc) for doc in doc_list]
+    stored, stored_fingerprints = load_stored_embeddings(cache_filename, model_name, len(doc_list), mmap=mmap,
+                                                         adopt_legacy=adopt_legacy)
+    if stored is None and not allow_encode and os.path.exists(cache_filename) and read_metadata(cache_filename) is None:
+        legacy = np.load(cache_filename, mmap_mode='r' if mmap else None)
+        if len(legacy) == len(doc_list):
+            print(f"WARNING: serving {cache_filename} without metadata, assuming its {len(legacy)} rows match the "
+                  f"documents in order. Nothing is written back; run `python -m scripts.build_embeddings` "
+                  f"to re-encode it.")
+            return legacy if legacy.dtype == np.dtype(dtype) else np.ascontiguousarray(legacy, dtype=dtype)
+    if stored is not None and stored_fingerprints is None:
+        # Legacy cache adopted positionally: record fingerprints without re-encoding.
+        embeddings = np.ascontiguousarray(stored, dtype=dtype)
+        save_embeddings(cache_filename, embeddings, fingerprints, model_name, dtype)
+        return np.load(cache_filename, mmap_mode='r') if mmap else embeddings
+
+    row_by_fingerprint = {}
+    if stored is not None:
+        for row, fingerprint in enumerate(stored_fingerprints):
+            row_by_fingerprint.setdefault(fingerprint, row)
+
+    # Encode each missing text once, even if it appears several times.
+    to_encode = {}
+    for doc, fingerprint in zip(doc_list, fingerprints):
+        if fingerprint not in row_by_fingerprint and fingerprint not in to_encode:
+            to_encode[fingerprint] = doc
+
+    if stored is not None and not to_encode and stored_fingerprints == fingerprints and stored.dtype == np.dtype(dtype):
+        print(f"Loading cached embeddings from {cache_filename}...")
+        return stored
+
+    if to_encode and not allow_encode:
+        raise RuntimeError(f"{cache_filename} is missing embeddings for {len(to_encode)} of {len(doc_list)} "
+                           f"documents; build them with `python -m scripts.build_embeddings`.")
+    if to_encode:
+        print(f"Computing embeddings for {len(to_encode)} new or changed documents...")
+        new_vectors = np.asarray(encode_fn(list(to_encode.values())), dtype='float32')
+        new_rows = dict(zip(to_encode.keys(), new_vectors))
+    else:
+        new_rows = {}
+
+    dimension = stored.shape[1] if stored is not None else new_vectors.shape[1]
+    embeddings = np.empty((len(doc_list), dimension), dtype='float32')
+    for i, fingerprint in enumerate(fingerprints):
+        row = row_by_fingerprint.get(fingerprint)
+        embeddings[i] = stored[row] if row is not None else new_rows[fingerprint]
+
+    reused = len(doc_list) - sum(1 for f in fingerprints if f not in row_by_fingerprint)
+    dropped = len(set(stored_fingerprints or []) - set(fingerprints))
+    save_embeddings(cache_filename, embeddings, fingerprints, model_name, dtype)
+    print(f"Embeddings cached as {dtype}: {reused} reused, {len(to_encode)} encoded, {dropped} dropped.")
+    return np.load(cache_filename, mmap_mode='r') if mmap else embeddings.astype(dtype, copy=False)
@@ -0,0 +1,94 @@
+# scripts/encoder_backends.py
+#
+# Backends for the sentence encoder, selected with VETLLM_ENCODER_BACKEND:
+#   torch      SentenceTransformer on PyTorch in float32 (the original encoder)
+#   onnx-int8  the same model exported to ONNX with int8 dynamic quantization, run by
+#              ONNX Runtime on the CPU
+#
+# The quantized model is exported once, ahead of time:
+#
+#   python -m scripts.encoder_backends export                      # avx2 kernels
+#   python -m scripts.encoder_backends export --quantization avx512_vnni
+#
+# which writes <VETLLM_ENCODER_ONNX_PATH>/onnx/model_qint8_<quantization>.onnx next to the
+# tokenizer and pooling config. Embeddings from the two backends are close but not
+# identical, so stored embeddings and cached query vectors are keyed by encoder_id()
+# and a collection is re-encoded (scripts/build_embeddings.py) when the backend changes.
+
+import os
+import sys
+import argparse
+
+ENCODER_BACKENDS = ("torch", "onnx-int8")
+QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+def onnx_file_name(quantization: str) -> str:
+    return f"onnx/model_qint8_{quantization}.onnx"
+
+def encoder_id(model_name: str, backend: str, quantization: str) -> str:
+    """
+    Identity of the vectors an encoder produces: the model name for torch (so embeddings
+    built before backends existed stay valid), the model plus backend otherwise.
+    """
+    if backend == "torch":
+        return model_name
+    return f"{model_name}+{backend}-{quantization}"
+
+def load_encoder(model_name: str, backend: str = "torch", threads: int = 0, onnx_path: str = None,
+                 quantization: str = "avx2"):
+    """
+    Returns a SentenceTransformer for the backend. threads > 0 sets the intra-op thread
+    count (torch.set_num_threads, or the ONNX Runtime session); 0 keeps the runtime default.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Expected one of: {', '.join(ENCODER_BACKENDS)}.")
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformer(model_name, device="cpu")
+
+    import onnxruntime
+    file_name = onnx_file_name(quantization)
+    if not os.path.exists(os.path.join(onnx_path, file_name)):
+        raise FileNotFoundError(f"{os.path.join(onnx_path, file_name)} not found; export it with "
+                                f"`python -m scripts.encoder_backends export --quantization {quantization}`.")
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    session_options.inter_op_num_threads = 1
+    if threads:
+        session_options.intra_op_num_threads = threads
+    return SentenceTransformer(onnx_path, device="cpu", backend="onnx", model_kwargs={
+        "file_name": file_name,
+        "provider": "CPUExecutionProvider",
+        "session_options": session_options,
+    })
+
+def export_quantized_encoder(model_name: str, onnx_path: str, quantization: str = "avx2") -> str:
+    """
+    Exports model_name to ONNX under onnx_path and writes its int8 dynamically quantized
+    copy; returns the path of the quantized file.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save_pretrained(onnx_path)
+    export_dynamic_quantized_onnx_model(model, quantization, onnx_path)
+    return os.path.join(onnx_path, onnx_file_name(quantization))
+
+def main(argv=None):
+    from scripts.models import ENCODER_MODEL_NAME, ENCODER_ONNX_PATH, ENCODER_QUANTIZATION
+    parser = argparse.ArgumentParser(description="Export the int8 ONNX encoder used by VETLLM_ENCODER_BACKEND=onnx-int8.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model", default=ENCODER_MODEL_NAME)
+    parser.add_argument("--output", default=ENCODER_ONNX_PATH, help="directory of the exported model")
+    parser.add_argument("--quantization", default=ENCODER_QUANTIZATION, choices=QUANTIZATION_CONFIGS,
+                        help="ONNX Runtime quantization preset for the target CPU")
+    args = parser.parse_args(argv)
+    path = export_quantized_encoder(args.model, args.output, args.quantization)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
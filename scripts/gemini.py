@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+
+class GeminiProvider:
+    """
+    Long-lived Gemini client built on the google-genai SDK.
+
+    The SDK client (API key, HTTP transport and its connection pool) is created once, on first
+    use, and shared by every later call, sync and async, instead of configuring the SDK and
+    building a model and chat session per request. Generation settings default to
+    `generation_config` and can be overridden per call. Each call is timed as setup
+    (client and request config) versus generation (the API round trip), and the totals are
+    reported by stats().
+
+    base_url (default: GEMINI_BASE_URL) points the client at another endpoint, such as the
+    local stand-in server in benchmarks/gemini_standin.py, for offline tests and benchmarks.
+    """
+    def __init__(self, model_name: str, generation_config: dict = None, api_key: str = None, base_url: str = None):
+        self.model_name = model_name
+        self.generation_config = dict(generation_config or {})
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.total_setup_seconds = 0.0
+        self.total_generation_seconds = 0.0
+        self.client_created_at = None
+
+    def _resolved_api_key(self):
+        return self.api_key or os.environ.get("GEMINI_API_KEY")
+
+    def has_api_key(self) -> bool:
+        return bool(self._resolved_api_key())
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google import genai
+                    from google.genai import types
+                    base_url = self.base_url or os.environ.get("GEMINI_BASE_URL")
+                    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+                    self._client = genai.Client(api_key=self._resolved_api_key(), http_options=http_options)
+                    self.client_created_at = time.time()
+        return self._client
+
+    def _request_config(self, settings: dict):
+        from google.genai import types
+        return types.GenerateContentConfig(**{**self.generation_config, **settings})
+
+    def _record(self, setup_seconds: float, generation_seconds: float) -> dict:
+        with self._stats_lock:
+            self.calls += 1
+            self.total_setup_seconds += setup_seconds
+            self.total_generation_seconds += generation_seconds
+        return {"setup_seconds": setup_seconds, "generation_seconds": generation_seconds}
+
+    def generate_timed(self, prompt: str, **settings):
+        """
+        Returns (text, {"setup_seconds", "generation_seconds"}).
+        """
+        start = time.perf_counter()
+        client = self._get_client()
+        config = self._request_config(settings)
+        setup_done = time.perf_counter()
+        response = client.models.generate_content(model=self.model_name, contents=prompt, config=config)
+        timings = self._record(setup_done - start, time.perf_counter() - setup_done)
+        return (response.text or "").strip(), timings
+
+    def generate(self, prompt: str, **settings) -> str:
+        return self.generate_timed(prompt, **settings)[0]
+
+    async def agenerate_timed(self, prompt: str, **settings):
+        start = time.perf_counter()
+        client = self._get_client()
+        config = self._request_config(settings)
+        setup_done = time.perf_counter()
+        response = await client.aio.models.generate_content(model=self.model_name, contents=prompt, config=config)
+        timings = self._record(setup_done - start, time.perf_counter() - setup_done)
+        return (response.text or "").strip(), timings
+
+    async def agenerate(self, prompt: str, **settings) -> str:
+        return (await self.agenerate_timed(prompt, **settings))[0]
+
+    async def astream(self, prompt: str, **settings):
+        """
+        Async generator of text chunks from the streaming API.
+        """
+        start = time.perf_counter()
+        client = self._get_client()
+        config = self._request_config(settings)
+        setup_done = time.perf_counter()
+        try:
+            stream = await client.aio.models.generate_content_stream(
+                model=self.model_name, contents=prompt, config=config
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            self._record(setup_done - start, time.perf_counter() - setup_done)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "base_url": self.base_url or os.environ.get("GEMINI_BASE_URL") or None,
+                "client_ready": self._client is not None,
+                "calls": self.calls,
+                "avg_setup_seconds": self.total_setup_seconds / self.calls if self.calls else 0.0,
+                "avg_generation_seconds": self.total_generation_seconds / self.calls if self.calls else 0.0,
+            }
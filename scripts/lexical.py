@@ -0,0 +1,221 @@
+import threading
+from collections import Counter, defaultdict
+import numpy as np
+
+def simple_fulltext_score(query: str, doc: str) -> float:
+    query_tokens = set(query.lower().split())
+    doc_tokens = set(doc.lower().split())
+    if not query_tokens:
+        return 0.0
+    return len(query_tokens.intersection(doc_tokens)) / len(query_tokens)
+
+def extract_condition(doc: str):
+    """
+    Returns the lower-cased condition from the first line starting with "Disease:",
+    or None if the document has no such line.
+    """
+    for line in doc.splitlines():
+        if line.strip().lower().startswith("disease:"):
+            return line.split(":", 1)[1].strip().lower()
+    return None
+
+def progressive_condition_score(query: str, doc: str) -> float:
+    """
+    Extracts the condition from the document (assumed to be in the line starting with "Disease:")
+    and computes a score based on the longest common prefix of tokens.
+    For example, if the query is "canine oral" and the condition is "canine oral plasmacytoma",
+    the score will be 1.0 (if both tokens match). If the condition is "canine parvovirus",
+    only the first token matches, and the score will be 0.5.
+    """
+    condition = extract_condition(doc)
+    if condition is None:
+        return 0.0
+    query_tokens = query.lower().split()
+    condition_tokens = condition.split()
+    match_count = 0
+    for qt, ct in zip(query_tokens, condition_tokens):
+        if qt == ct:
+            match_count += 1
+        else:
+            break
+    return match_count / len(query_tokens)
+
+class InvertedIndex:
+    """
+    Token -> posting list index over a document collection.
+    Tokens are produced exactly like simple_fulltext_score (lower-cased, whitespace split),
+    so score() returns the same overlap ratio, but only for documents that share at
+    least one token with the query instead of re-tokenizing the whole corpus per query.
+    """
+    def __init__(self, doc_list):
+        postings = defaultdict(list)
+        for doc_id, doc in enumerate(doc_list):
+            for token in set(doc.lower().split()):
+                postings[token].append(doc_id)
+        self.postings = dict(postings)
+        self.num_docs = len(doc_list)
+
+    def score(self, query: str) -> dict:
+        """
+        Returns {doc_id: overlap_ratio} for every document with a non-zero score.
+        """
+        query_tokens = set(query.lower().split())
+        if not query_tokens:
+            return {}
+        counts = defaultdict(int)
+        for token in query_tokens:
+            for doc_id in self.postings.get(token, ()):
+                counts[doc_id] += 1
+        num_query_tokens = len(query_tokens)
+        return {doc_id: count / num_query_tokens for doc_id, count in counts.items()}
+
+class BM25Index:
+    """
+    Okapi BM25 over a CSR term-document matrix (terms x documents) whose entries are the
+    precomputed BM25 term weights, so scoring a query is one sparse vector-matrix product.
+    Scores are divided by the best score of the query, giving values in [0, 1] that can be
+    blended with the FAISS vector_score exactly like the overlap ratio. Needs scipy, which
+    is only imported when a BM25 index is built.
+    """
+    def __init__(self, doc_list, k1: float = 1.5, b: float = 0.75):
+        from scipy.sparse import csr_matrix
+        vocabulary = {}
+        rows, cols, term_freqs = [], [], []
+        doc_lengths = np.zeros(len(doc_list), dtype=np.float32)
+        for doc_id, doc in enumerate(doc_list):
+            tokens = doc.lower().split()
+            doc_lengths[doc_id] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                rows.append(vocabulary.setdefault(token, len(vocabulary)))
+                cols.append(doc_id)
+                term_freqs.append(tf)
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        term_freqs = np.asarray(term_freqs, dtype=np.float32)
+
+        num_docs = len(doc_list)
+        doc_freqs = np.bincount(rows, minlength=len(vocabulary))
+        idf = np.log1p((num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = float(doc_lengths.mean()) if num_docs and doc_lengths.mean() > 0 else 1.0
+        length_norm = k1 * (1 - b + b * doc_lengths[cols] / avg_length)
+        weights = idf[rows] * term_freqs * (k1 + 1) / (term_freqs + length_norm)
+
+        self.vocabulary = vocabulary
+        self.matrix = csr_matrix((weights, (rows, cols)), shape=(len(vocabulary), num_docs), dtype=np.float32)
+        self.num_docs = num_docs
+
+    def score(self, query: str, top_k: int = None, include_ids=()) -> dict:
+        """
+        Returns {doc_id: normalized_bm25} for the top_k documents (all matching documents
+        when top_k is None), plus the scores of any matching doc ids in include_ids so
+        candidates coming from the vector leg keep their lexical score.
+        """
+        term_ids = [self.vocabulary[token] for token in query.lower().split() if token in self.vocabulary]
+        if not term_ids:
+            return {}
+        from scipy.sparse import csr_matrix
+        query_terms = Counter(term_ids)
+        query_vector = csr_matrix(
+            (np.fromiter(query_terms.values(), dtype=np.float32, count=len(query_terms)),
+             (np.zeros(len(query_terms), dtype=np.int32),
+              np.fromiter(query_terms.keys(), dtype=np.int32, count=len(query_terms)))),
+            shape=(1, self.matrix.shape[0]),
+        )
+        result = query_vector @ self.matrix
+        doc_ids = result.indices
+        values = result.data
+        positive = values > 0
+        doc_ids, values = doc_ids[positive], values[positive]
+        if not len(values):
+            return {}
+        values = values / values.max()
+
+        if top_k is not None and len(values) > top_k:
+            selected = np.argpartition(-values, top_k - 1)[:top_k]
+            scores = {int(doc_ids[i]): float(values[i]) for i in selected}
+            if len(include_ids):
+                wanted = np.isin(doc_ids, np.asarray(list(include_ids), dtype=np.int64))
+                for i in np.flatnonzero(wanted):
+                    scores[int(doc_ids[i])] = float(values[i])
+            return scores
+        return {int(doc_id): float(value) for doc_id, value in zip(doc_ids, values)}
+
+class _TrieNode:
+    __slots__ = ("children", "doc_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.doc_ids = []
+
+class ConditionTrie:
+    """
+    Prefix trie over the condition tokens of each document ("Disease:" line), extracted once.
+    Every node lists the documents whose condition starts with the tokens on its path, so the
+    longest-common-prefix match of progressive_condition_score becomes a single walk down the
+    query's leading tokens.
+    """
+    def __init__(self, doc_list):
+        self.root = _TrieNode()
+        self.condition_tokens = []
+        for doc_id, doc in enumerate(doc_list):
+            condition = extract_condition(doc)
+            tokens = tuple(condition.split()) if condition else ()
+            self.condition_tokens.append(tokens)
+            node = self.root
+            for token in tokens:
+                child = node.children.get(token)
+                if child is None:
+                    child = node.children[token] = _TrieNode()
+                child.doc_ids.append(doc_id)
+                node = child
+
+    def score(self, query: str) -> dict:
+        """
+        Returns {doc_id: matched_prefix_tokens / query_tokens} for every document sharing at
+        least the query's first token, identical to progressive_condition_score.
+        """
+        query_tokens = query.lower().split()
+        if not query_tokens:
+            return {}
+        path = []
+        node = self.root
+        for token in query_tokens:
+            node = node.children.get(token)
+            if node is None:
+                break
+            path.append(node)
+        scores = {}
+        num_query_tokens = len(query_tokens)
+        # Deepest node first: a document keeps the score of its longest matching prefix.
+        for depth in range(len(path), 0, -1):
+            for doc_id in path[depth - 1].doc_ids:
+                if doc_id not in scores:
+                    scores[doc_id] = depth / num_query_tokens
+        return scores
+
+# Lexical structures are derived from a document list once and reused for every query.
+# They are keyed on the identity of the list, which the callers keep for the process lifetime.
+_lexical_cache = {}
+_lexical_cache_lock = threading.Lock()
+
+def get_lexical_index(kind: str, doc_list, builder):
+    key = (kind, id(doc_list))
+    cached = _lexical_cache.get(key)
+    if cached is not None and cached[0] is doc_list and cached[1] == len(doc_list):
+        return cached[2]
+    with _lexical_cache_lock:
+        cached = _lexical_cache.get(key)
+        if cached is not None and cached[0] is doc_list and cached[1] == len(doc_list):
+            return cached[2]
+        index = builder(doc_list)
+        _lexical_cache[key] = (doc_list, len(doc_list), index)
+        return index
+
+def get_fulltext_index(doc_list) -> InvertedIndex:
+    return get_lexical_index("overlap", doc_list, InvertedIndex)
+
+def get_bm25_index(doc_list) -> BM25Index:
+    return get_lexical_index("bm25", doc_list, BM25Index)
+
+def get_condition_trie(doc_list) -> ConditionTrie:
+    return get_lexical_index("condition", doc_list, ConditionTrie)
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+
+def make_cache_key(prompt: str, provider: str, model_name: str, generation_config: dict = None) -> str:
+    """
+    Hash of everything that determines an LLM answer: prompt, provider, model and generation settings.
+    """
+    payload = json.dumps([prompt, provider, model_name, generation_config or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM answers.
+
+    The memory tier is an LRU of at most max_size entries. The optional disk tier is a SQLite
+    table at db_path that survives restarts; disk hits are promoted to memory. Entries in both
+    tiers expire ttl_seconds after they were stored. Hits and misses are counted per label
+    (the endpoint, e.g. "clinical/line_of_treatment").
+
+    Safe to call from several threads: the SQLite connection is shared across threads
+    (check_same_thread=False), so every use of it happens under self._lock.
+    """
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 86400, db_path: str = None,
+                 max_disk_entries: int = 100000):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        self._puts_since_prune = 0
+        self._db = None
+        if db_path and max_size > 0:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str, label: str = "default"):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats[label]["memory_hits"] += 1
+                    return response
+                del self._entries[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._remember(key, row[0], row[1])
+                    self._stats[label]["disk_hits"] += 1
+                    return row[0]
+            self._stats[label]["misses"] += 1
+            return None
+
+    def put(self, key: str, response: str):
+        if not self.enabled:
+            return
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, response, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, response, now, expires_at),
+                )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= 100:
+                    self._prune_disk(now)
+                self._db.commit()
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _prune_disk(self, now: float):
+        self._puts_since_prune = 0
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)",
+            (self.max_disk_entries,),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_label = {}
+            for label, counts in self._stats.items():
+                hits = counts["memory_hits"] + counts["disk_hits"]
+                lookups = hits + counts["misses"]
+                per_label[label] = dict(counts, hit_rate=hits / lookups if lookups else 0.0)
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "disk": self.db_path if self._db is not None else None,
+                "endpoints": per_label,
+            }
@@ -1,109 +1,205 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-import spacy
-from spacy.matcher import PhraseMatcher
-
-# Load the encoder (used for all document embeddings)
-encoder = SentenceTransformer('paraphrase-mpnet-base-v2')
-
-def build_index(doc_list, cache_filename):
-    if os.path.exists(cache_filename):
-        print(f"Loading cached embeddings from {cache_filename}...")
-        embeddings = np.load(cache_filename)
-    else:
-        print("Computing embeddings...")
-        embeddings = encoder.encode(doc_list, convert_to_numpy=True).astype('float32')
-        np.save(cache_filename, embeddings)
-        print("Embeddings computed and cached.")
-    dimension = embeddings.shape[1]
-    index_obj = faiss.IndexFlatL2(dimension)
-    index_obj.add(embeddings)
+from scripts.router import determine_category
+from scripts.embedding_cache import QueryEmbeddingCache
+from scripts.embedding_batcher import EmbeddingBatcher
+from scripts.embedding_store import load_embeddings, embeddings_digest
+from scripts.vector_index import load_or_build_index
+from scripts.rerank import CandidateReranker
+from scripts.encoder_backends import load_encoder, encoder_id
+from scripts.lexical import simple_fulltext_score, progressive_condition_score, get_fulltext_index, get_bm25_index, get_condition_trie
+
+# The encoder (used for all document embeddings) is loaded on first use, or ahead of
+# time by calling get_encoder() from a startup thread.
+# VETLLM_ENCODER_BACKEND picks the runtime: "torch" (float32 PyTorch) or "onnx-int8" (the
+# int8-quantized ONNX export in VETLLM_ENCODER_ONNX_PATH, see scripts/encoder_backends.py).
+# VETLLM_ENCODER_THREADS sets the intra-op threads of either runtime (0: runtime default).
+ENCODER_MODEL_NAME = 'paraphrase-mpnet-base-v2'
+ENCODER_BACKEND = os.environ.get("VETLLM_ENCODER_BACKEND", "torch")
+ENCODER_QUANTIZATION = os.environ.get("VETLLM_ENCODER_QUANTIZATION", "avx2")
+ENCODER_ONNX_PATH = os.environ.get("VETLLM_ENCODER_ONNX_PATH", f"models/{ENCODER_MODEL_NAME}-onnx")
+# Stored document embeddings and cached query vectors are keyed by this, so switching
+# backend never mixes vectors from two encoders.
+ENCODER_ID = encoder_id(ENCODER_MODEL_NAME, ENCODER_BACKEND, ENCODER_QUANTIZATION)
+# Embedding files written before metadata was recorded are re-encoded, unless
+# VETLLM_ADOPT_LEGACY_EMBEDDINGS=1 adopts them as-is (torch backend only, the encoder
+# they were built with). Adopting trusts that no document changed since.
+ADOPT_LEGACY_EMBEDDINGS = os.environ.get("VETLLM_ADOPT_LEGACY_EMBEDDINGS", "0") == "1" and ENCODER_BACKEND == "torch"
+_encoder = None
+_encoder_lock = threading.Lock()
+
+def get_encoder():
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                # Read at load time so scripts/build_embeddings.py workers can set it per process.
+                threads = int(os.environ.get("VETLLM_ENCODER_THREADS") or 0)
+                _encoder = load_encoder(ENCODER_MODEL_NAME, ENCODER_BACKEND, threads=threads,
+                                        onnx_path=ENCODER_ONNX_PATH, quantization=ENCODER_QUANTIZATION)
+    return _encoder
+
+# Cache of query embeddings; the front-ends send the same canned prefixed queries repeatedly.
+# Set VETLLM_QUERY_CACHE_SIZE=0 to disable, VETLLM_QUERY_CACHE_PATH to persist across restarts.
+query_embedding_cache = QueryEmbeddingCache(
+    max_size=int(os.environ.get("VETLLM_QUERY_CACHE_SIZE", "1024")),
+    persist_path=os.environ.get("VETLLM_QUERY_CACHE_PATH") or None,
+    model_name=ENCODER_ID,
+)
+
+# Query cache misses from concurrent requests are encoded together by one worker thread,
+# which waits up to VETLLM_EMBED_BATCH_WAIT_MS for more queries (VETLLM_EMBED_MAX_BATCH at
+# most) while requests are arriving concurrently. VETLLM_EMBED_BATCHING=0 encodes each
+# query on its request thread instead.
+EMBED_BATCHING = os.environ.get("VETLLM_EMBED_BATCHING", "1") == "1"
+embedding_batcher = EmbeddingBatcher(
+    lambda texts: get_encoder().encode(texts, convert_to_numpy=True).astype('float32'),
+    max_wait_ms=float(os.environ.get("VETLLM_EMBED_BATCH_WAIT_MS", "3")),
+    max_batch=int(os.environ.get("VETLLM_EMBED_MAX_BATCH", "32")),
+)
+
+# Memory-map embeddings and serialized FAISS indexes so worker processes share them.
+MMAP_INDEX = os.environ.get("VETLLM_MMAP_INDEX", "0") == "1"
+
+# FAISS index type and parameters used by build_index (flat, hnsw, ivf, ivfpq, and the
+# compressed fp16, sq8, sq4 and pq).
+INDEX_SPEC = os.environ.get("VETLLM_INDEX_SPEC", "flat")
+
+# Precision of the embedding files on disk: float32 or float16.
+EMBEDDING_DTYPE = os.environ.get("VETLLM_EMBEDDING_DTYPE", "float32")
+
+# Scorer for the full-text leg of hybrid_search: "overlap" (token overlap ratio) or "bm25".
+FULLTEXT_MODE = os.environ.get("VETLLM_FULLTEXT_MODE", "overlap")
+
+# Optional cross-encoder rerank of the fused candidates (VETLLM_RERANK=1, or per request).
+RERANK_ENABLED = os.environ.get("VETLLM_RERANK", "0") == "1"
+reranker = CandidateReranker(
+    model_name=os.environ.get("VETLLM_RERANK_MODEL", "ms-marco-TinyBERT-L-2-v2"),
+    top_n=int(os.environ.get("VETLLM_RERANK_TOP_N", "5")),
+    budget_ms=float(os.environ.get("VETLLM_RERANK_BUDGET_MS", "150")),
+    margin=float(os.environ.get("VETLLM_RERANK_MARGIN", "0.15")),
+    max_pending=int(os.environ.get("VETLLM_RERANK_MAX_PENDING", "4")),
+)
+
+def encode_documents(doc_list, batch_size: int = 32):
+    return get_encoder().encode(doc_list, batch_size=batch_size, convert_to_numpy=True).astype('float32')
+
+def build_index(doc_list, cache_filename, mmap: bool = None, index_spec: str = None, allow_encode: bool = True):
+    """
+    Returns (FAISS index, embedding matrix) for doc_list.
+    With mmap (default: VETLLM_MMAP_INDEX=1) the embeddings and a serialized copy of the
+    index are memory-mapped read-only, so `uvicorn --workers N` shares one physical copy.
+    index_spec (default: VETLLM_INDEX_SPEC) selects the index type and its parameters,
+    e.g. "flat", "hnsw:M=32,efSearch=64", "ivf:nlist=64,nprobe=8", "ivfpq:nlist=64,m=48",
+    or a compressed "sq8", "sq4", "fp16" or "pq:m=96"; see scripts/vector_index.py.
+    The embedding file is stored as VETLLM_EMBEDDING_DTYPE (float32 or float16).
+    With allow_encode=False the embeddings must already be cached (see
+    scripts/build_embeddings.py); missing ones raise instead of being encoded here.
+    """
+    if mmap is None:
+        mmap = MMAP_INDEX
+    if index_spec is None:
+        index_spec = INDEX_SPEC
+    # Cached rows are matched to documents by content hash, so only new or edited
+    # documents are re-encoded and removed ones are dropped.
+    embeddings = load_embeddings(doc_list, cache_filename, ENCODER_ID, encode_documents, mmap=mmap,
+                                 allow_encode=allow_encode, adopt_legacy=ADOPT_LEGACY_EMBEDDINGS,
+                                 dtype=EMBEDDING_DTYPE)
+    index_obj = load_or_build_index(embeddings, cache_filename, embeddings_digest(cache_filename),
+                                    mmap=mmap, index_spec=index_spec)
     print(f"FAISS Index built with {index_obj.ntotal} documents.")
+    # Build the lexical index up front so the first query doesn't pay for it.
+    if FULLTEXT_MODE == "bm25":
+        get_bm25_index(doc_list)
+    else:
+        get_fulltext_index(doc_list)
+        get_condition_trie(doc_list)
     return index_obj, embeddings
 
-def simple_fulltext_score(query: str, doc: str) -> float:
-    query_tokens = set(query.lower().split())
-    doc_tokens = set(doc.lower().split())
-    if not query_tokens:
-        return 0.0
-    return len(query_tokens.intersection(doc_tokens)) / len(query_tokens)
-
-def progressive_condition_score(query: str, doc: str) -> float:
-    """
-    Extracts the condition from the document (assumed to be in the line starting with "Disease:")
-    and computes a score based on the longest common prefix of tokens.
-    For example, if the query is "canine oral" and the condition is "canine oral plasmacytoma",
-    the score will be 1.0 (if both tokens match). If the condition is "canine parvovirus",
-    only the first token matches, and the score will be 0.5.
-    """
-    lines = doc.splitlines()
-    disease_line = None
-    for line in lines:
-        if line.strip().lower().startswith("disease:"):
-            disease_line = line
-            break
-    if not disease_line:
-        return 0.0
-    # Remove the "Disease:" prefix and split into tokens.
-    condition = disease_line.split(":", 1)[1].strip().lower()
-    query_tokens = query.lower().split()
-    condition_tokens = condition.split()
-    match_count = 0
-    for qt, ct in zip(query_tokens, condition_tokens):
-        if qt == ct:
-            match_count += 1
+def determine_category_spacy(query: str) -> str:
+    """
+    Routes a query with the original full en_core_web_sm pipeline, whatever VETLLM_ROUTER says.
+    """
+    return determine_category(query, "spacy")
+
+def encode_query(query: str):
+    """
+    Returns the (1, dimension) float32 embedding of a query, served from the query cache when possible.
+    """
+    vector = query_embedding_cache.get(query)
+    if vector is None:
+        if EMBED_BATCHING:
+            vector = embedding_batcher.encode(query)
         else:
-            break
-    return match_count / len(query_tokens)
-
-# Set up spaCy and PhraseMatcher for simple keyword matching
-nlp = spacy.load("en_core_web_sm")
-pharma_keywords = [
-    "indication", "tradename", "brand name", "active ingredient", "dose rate",
-    "dosage", "administration", "contraindication", "food timing",
-    "meal timing", "mechanism", "mechanism of action", "products"
-]
-clinical_keywords = [
-    "line of treatment", "treatment plan", "treatment protocol", "synonyms",
-    "drug of choice", "preferred drug", "differential diagnosis",
-    "diagnostic differentials", "management"
-]
-disease_keywords = [
-    "symptoms", "clinical signs", "manifestations", "presentation",
-    "signs and symptoms", "symptomatology"
-]
-
-matcher = PhraseMatcher(nlp.vocab)
-def add_patterns(label: str, keywords: list):
-    patterns = [nlp(keyword) for keyword in keywords]
-    matcher.add(label, patterns)
-
-add_patterns("pharma", pharma_keywords)
-add_patterns("clinical", clinical_keywords)
-add_patterns("disease", disease_keywords)
+            vector = get_encoder().encode([query], convert_to_numpy=True).astype('float32')[0]
+        query_embedding_cache.put(query, vector)
+    return vector.reshape(1, -1)
 
-def determine_category_spacy(query: str) -> str:
-    doc = nlp(query.lower())
-    matches = matcher(doc)
-    counts = {"pharma": 0, "clinical": 0, "disease": 0}
-    for match_id, start, end in matches:
-        category = nlp.vocab.strings[match_id]
-        counts[category] += 1
-    if all(v == 0 for v in counts.values()):
-        return "clinical"
-    return max(counts, key=counts.get)
-
-def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_candidates: int = 5, alpha: float = 0.5):
+def encode_queries(queries: list):
+    """
+    Returns the (len(queries), dimension) float32 embeddings of several queries. Cached
+    queries are reused and all the others are encoded together in one model call.
+    """
+    vectors = [query_embedding_cache.get(query) for query in queries]
+    missing = list(dict.fromkeys(q for q, v in zip(queries, vectors) if v is None))
+    if missing:
+        encoded = dict(zip(missing, get_encoder().encode(missing, convert_to_numpy=True).astype('float32')))
+        for query, vector in encoded.items():
+            query_embedding_cache.put(query, vector)
+        vectors = [v if v is not None else encoded[q] for q, v in zip(queries, vectors)]
+    return np.vstack(vectors)
+
+def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_candidates: int = 5, alpha: float = 0.5,
+                  fulltext_mode: str = None, rerank: bool = None, timings: dict = None, fanout: bool = False):
     """
     Expects doc_collections as a dict. Typically with keys "clinical", "disease", "pharma".
     Each value is a tuple: (list_of_documents, corresponding_FAISS_index)
 
+    fulltext_mode selects the lexical scorer: "overlap" (default, progressive condition
+    scoring for the disease category) or "bm25" (normalized BM25 for every category).
+    When not given, VETLLM_FULLTEXT_MODE is used.
+
     If the determined category (via spaCy) is not found in doc_collections,
     then the function falls back to using the first (or only) key provided.
+
+    rerank (default: VETLLM_RERANK) reorders the top candidates with the cross-encoder
+    reranker. When a timings dict is given, retrieval_ms and the rerank status and
+    rerank_ms are recorded in it.
+
+    With fanout=True the query is not routed: every collection is searched and the
+    results are fused, see fanout_search.
     """
-    category = determine_category_spacy(query)
+    if fanout:
+        return fanout_search(query, doc_collections, top_k_vector=top_k_vector, top_candidates=top_candidates,
+                             alpha=alpha, fulltext_mode=fulltext_mode, timings=timings)
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    category, docs, index_obj = select_collection(query, doc_collections)
+    print(f"Query routed to category: {category}")
+    
+    query_vector = encode_query(query)
+    distances, indices = index_obj.search(query_vector, top_k_vector)
+    candidates = rank_candidates(query, category, docs, distances[0], indices[0],
+                                 top_candidates=top_candidates, alpha=alpha, fulltext_mode=fulltext_mode)
+    timings["retrieval_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    if RERANK_ENABLED if rerank is None else rerank:
+        candidates = reranker.rerank(query, category, candidates, timings)
+    else:
+        timings["rerank"] = "disabled"
+    return candidates
+
+def select_collection(query: str, doc_collections: dict):
+    """
+    Returns (category, docs, index_obj) for the collection a query is routed to.
+    With a single collection there is nothing to choose, so the router is not run.
+    """
+    if len(doc_collections) == 1:
+        category, (docs, index_obj) = next(iter(doc_collections.items()))
+        return category, docs, index_obj
+    category = determine_category(query)
     if category in doc_collections:
         docs, index_obj = doc_collections[category]
     else:
@@ -111,32 +207,54 @@ def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_
         # Update category to the fallback key
         category = key
         docs, index_obj = doc_collections[key]
-    print(f"Query routed to category: {category}")
-    
-    query_vector = encoder.encode([query], convert_to_numpy=True).astype('float32')
-    distances, indices = index_obj.search(query_vector, top_k_vector)
+    return category, docs, index_obj
+
+def rank_candidates(query: str, category: str, docs, distances, indices, top_candidates: int = 5,
+                    alpha: float = 0.5, fulltext_mode: str = None):
+    """
+    Blends one row of FAISS results with the full-text leg and returns the top candidates.
+    """
     vector_candidates = []
-    for dist, idx in zip(distances[0], indices[0]):
-        doc_text = docs[idx]
+    for dist, idx in zip(distances, indices):
+        # Approximate indexes return -1 when fewer than top_k_vector neighbours were found.
+        if idx < 0:
+            continue
         vec_sim = 1 / (1 + dist)
         vector_candidates.append({
             "id": idx,
-            "text": doc_text,
             "vector_score": vec_sim,
         })
     
+    fulltext_mode = fulltext_mode or FULLTEXT_MODE
     fulltext_candidates = []
-    for i, doc in enumerate(docs):
-        # Use progressive condition scoring for disease category, otherwise simple scoring.
-        if category == "disease":
-            ft_score = progressive_condition_score(query, doc)
-        else:
-            ft_score = simple_fulltext_score(query, doc)
-        if ft_score > 0:
+    if fulltext_mode == "bm25":
+        # One sparse mat-vec over the collection's term matrix, keeping the top candidates
+        # plus the lexical scores of the vector hits so the blend stays comparable.
+        ft_scores = get_bm25_index(docs).score(
+            query, top_k=top_candidates, include_ids=[int(c["id"]) for c in vector_candidates]
+        )
+        for i in sorted(ft_scores):
+            fulltext_candidates.append({
+                "id": i,
+                "fulltext_score": ft_scores[i],
+            })
+    elif category == "disease":
+        # Use progressive condition scoring for disease category, as a walk down the
+        # precomputed condition trie instead of re-reading every document.
+        ft_scores = get_condition_trie(docs).score(query)
+        for i in sorted(ft_scores):
             fulltext_candidates.append({
                 "id": i,
-                "text": doc,
-                "fulltext_score": ft_score,
+                "fulltext_score": ft_scores[i],
+            })
+    else:
+        # Simple overlap scoring through the inverted index: only documents sharing
+        # a token with the query are touched. Keep doc order so ties break as before.
+        ft_scores = get_fulltext_index(docs).score(query)
+        for i in sorted(ft_scores):
+            fulltext_candidates.append({
+                "id": i,
+                "fulltext_score": ft_scores[i],
             })
     
     # Merge vector and fulltext candidates.
@@ -144,7 +262,6 @@ def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_
     for cand in vector_candidates:
         candidates[cand["id"]] = {
             "id": cand["id"],
-            "text": cand["text"],
             "vector_score": cand["vector_score"],
             "fulltext_score": 0.0
         }
@@ -154,7 +271,6 @@ def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_
         else:
             candidates[cand["id"]] = {
                 "id": cand["id"],
-                "text": cand["text"],
                 "vector_score": 0.0,
                 "fulltext_score": cand["fulltext_score"],
             }
@@ -164,24 +280,99 @@ def hybrid_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_
     
     sorted_candidates = sorted(candidates.values(), key=lambda x: x["hybrid_score"], reverse=True)
     top_cands = sorted_candidates[:top_candidates]
+    # Documents may be a DocumentStore rendering text on access: only render what is returned.
+    for cand in top_cands:
+        cand["text"] = docs[cand["id"]]
     return top_cands
 
-def format_pharma(item):
-    """
-    Returns a formatted string representation of a pharma document.
-    Now includes the key "metabolism_and_elimination" if available.
-    """
-    pharma_info = item.get("pharma_info", {})
-    text = (
-        f"Active Ingredient: {item.get('Active Ingredient', '')}\n"
-        f"Trade Name: {item.get('Trade Name', '')}\n"
-        f"Ingredient: {item.get('Ingredient', '')}\n"
-        f"Dose Rate: {pharma_info.get('dose_rate', '')}\n"
-        f"Indication: {pharma_info.get('indication', '')}\n"
-        f"Contraindication: {pharma_info.get('contraindication', '')}\n"
-        f"Food Timing: {pharma_info.get('food_timing', '')}\n"
-        f"Mechanism: {pharma_info.get('mechanism_of_action', '')}\n"
-        f"Metabolism and Elimination: {pharma_info.get('metabolism_and_elimination', '')}\n"
-        f"Products: {pharma_info.get('products', '')}"
-    )
-    return text
+# Per-collection searches of fanout_search run here, so they overlap (FAISS releases the GIL).
+_fanout_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("VETLLM_FANOUT_WORKERS", "4")),
+                                      thread_name_prefix="fanout")
+
+def _search_collection(query: str, category: str, docs, index_obj, query_vector, top_k_vector: int,
+                       top_candidates: int, alpha: float, fulltext_mode: str):
+    start = time.perf_counter()
+    distances, indices = index_obj.search(query_vector, top_k_vector)
+    candidates = rank_candidates(query, category, docs, distances[0], indices[0],
+                                 top_candidates=top_candidates, alpha=alpha, fulltext_mode=fulltext_mode)
+    return candidates, (time.perf_counter() - start) * 1000.0
+
+def reciprocal_rank_fusion(rankings, rrf_k: int = 60) -> dict:
+    """
+    rankings: lists of keys, best first. Returns {key: sum of 1 / (rrf_k + rank)} over the
+    lists the key appears in (rank starting at 1).
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return scores
+
+def fanout_search(query: str, doc_collections: dict, top_k_vector: int = 3, top_candidates: int = 5,
+                  alpha: float = 0.5, fulltext_mode: str = None, rrf_k: int = 60, timings: dict = None):
+    """
+    Searches every collection in doc_collections concurrently with one shared query
+    embedding, and fuses the results with reciprocal rank fusion.
+
+    Each collection contributes two rankings of its candidates, one by vector_score and
+    one by fulltext_score, so a document found by both legs ranks above one found by
+    either alone, and the raw scores (which are not comparable across collections) are
+    never mixed. Returns the top_candidates fused hits, each tagged with its "collection"
+    and carrying its "rrf_score" next to the usual per-collection scores. When a timings
+    dict is given, encode_ms, per-collection search ms and retrieval_ms are recorded.
+    """
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    query_vector = encode_query(query)
+    timings["encode_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    futures = {
+        category: _fanout_executor.submit(_search_collection, query, category, docs, index_obj, query_vector,
+                                          top_k_vector, top_candidates, alpha, fulltext_mode)
+        for category, (docs, index_obj) in doc_collections.items()
+    }
+    hits = {}
+    rankings = []
+    for category, future in futures.items():
+        candidates, elapsed_ms = future.result()
+        timings[f"{category}_ms"] = round(elapsed_ms, 3)
+        for cand in candidates:
+            hits[(category, int(cand["id"]))] = dict(cand, collection=category)
+        for score in ("vector_score", "fulltext_score"):
+            ranked = sorted((c for c in candidates if c[score] > 0), key=lambda c: c[score], reverse=True)
+            rankings.append([(category, int(c["id"])) for c in ranked])
+    fused = reciprocal_rank_fusion(rankings, rrf_k)
+    results = []
+    for key in sorted(fused, key=lambda k: (fused[k], hits[k]["hybrid_score"]), reverse=True)[:top_candidates]:
+        hits[key]["rrf_score"] = fused[key]
+        results.append(hits[key])
+    timings["retrieval_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    return results
+
+def hybrid_search_many(queries: list, doc_collections, top_k_vector: int = 3, top_candidates: int = 5,
+                       alpha: float = 0.5, fulltext_mode: str = None):
+    """
+    Batched hybrid_search: returns one candidate list per query, in order.
+
+    doc_collections is either one dict used for every query or a list with one dict per
+    query. All queries are encoded in a single model call (cache hits are skipped) and
+    each FAISS index is searched once with every query routed to it.
+    """
+    if not queries:
+        return []
+    if isinstance(doc_collections, dict):
+        doc_collections = [doc_collections] * len(queries)
+    routes = [select_collection(query, collections) for query, collections in zip(queries, doc_collections)]
+    query_vectors = encode_queries(queries)
+
+    # Group the queries by target index so each index sees one multi-row search.
+    groups = {}
+    for i, (category, docs, index_obj) in enumerate(routes):
+        groups.setdefault(id(index_obj), []).append(i)
+    results = [None] * len(queries)
+    for positions in groups.values():
+        category, docs, index_obj = routes[positions[0]]
+        distances, indices = index_obj.search(query_vectors[positions], top_k_vector)
+        for row, i in enumerate(positions):
+            results[i] = rank_candidates(queries[i], category, docs, distances[row], indices[row],
+                                         top_candidates=top_candidates, alpha=alpha, fulltext_mode=fulltext_mode)
+    return results
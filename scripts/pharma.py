@@ -1,49 +1,60 @@
 import os
 import json
 
-def load_pharma_documents(database_path="database/pharma.json"):
+from scripts.document_store import DocumentStore
+
+# Fields kept per pharma record: the names at the top level of a record, then the
+# pharma_info fields used by the document text and the dose rate routes.
+PHARMA_NAME_COLUMNS = ("Active Ingredient", "Trade Name", "Ingredient")
+PHARMA_INFO_COLUMNS = ("dose_rate", "indication", "contraindication", "food_timing",
+                       "mechanism_of_action", "metabolism_and_elimination", "products")
+PHARMA_COLUMNS = PHARMA_NAME_COLUMNS + PHARMA_INFO_COLUMNS
+
+# (label, column) of each line of a pharma document's text, in order.
+PHARMA_TEXT_FIELDS = (
+    ("Active Ingredient", "Active Ingredient"),
+    ("Trade Name", "Trade Name"),
+    ("Ingredient", "Ingredient"),
+    ("Dose Rate", "dose_rate"),
+    ("Indication", "indication"),
+    ("Contraindication", "contraindication"),
+    ("Food Timing", "food_timing"),
+    ("Mechanism", "mechanism_of_action"),
+    ("Metabolism and Elimination", "metabolism_and_elimination"),
+    ("Products", "products"),
+)
+
+def pharma_fields(item) -> dict:
     """
-    Loads the pharma data from the JSON file and returns a list of formatted strings.
-    Each string includes the following fields:
-      - Active Ingredient
-      - Trade Name
-      - Ingredient
-      - Dose Rate
-      - Indication
-      - Contraindication
-      - Food Timing
-      - Mechanism
-      - Metabolism and Elimination
-      - Products
+    Flattens one pharma.json record into PHARMA_COLUMNS, with '' for missing fields.
     """
-    with open(database_path, 'r') as f:
-        pharma_data = json.load(f)
+    pharma_info = item.get("pharma_info", {})
+    fields = {column: item.get(column, '') for column in PHARMA_NAME_COLUMNS}
+    fields.update({column: pharma_info.get(column, '') for column in PHARMA_INFO_COLUMNS})
+    return fields
 
-    documents = []
-
-    def format_pharma(item):
-        pharma_info = item.get("pharma_info", {})
-        text = (
-            f"Active Ingredient: {item.get('Active Ingredient', '')}\n"
-            f"Trade Name: {item.get('Trade Name', '')}\n"
-            f"Ingredient: {item.get('Ingredient', '')}\n"
-            f"Dose Rate: {pharma_info.get('dose_rate', '')}\n"
-            f"Indication: {pharma_info.get('indication', '')}\n"
-            f"Contraindication: {pharma_info.get('contraindication', '')}\n"
-            f"Food Timing: {pharma_info.get('food_timing', '')}\n"
-            f"Mechanism: {pharma_info.get('mechanism_of_action', '')}\n"
-            f"Metabolism and Elimination: {pharma_info.get('metabolism_and_elimination', '')}\n"
-            f"Products: {pharma_info.get('products', '')}"
-        )
-        return text
+def render_pharma(fields) -> str:
+    return "\n".join(f"{label}: {fields[column]}" for label, column in PHARMA_TEXT_FIELDS)
 
-    if isinstance(pharma_data, list):
-        for item in pharma_data:
-            documents.append(format_pharma(item))
-    else:
-        documents.append(format_pharma(pharma_data))
+def format_pharma(item):
+    """
+    Returns the formatted string representation of a pharma.json record, as used for
+    retrieval and as LLM context.
+    """
+    return render_pharma(pharma_fields(item))
 
-    return documents
+def build_pharma_store(records) -> DocumentStore:
+    return DocumentStore(PHARMA_COLUMNS, (pharma_fields(item) for item in records), render_pharma)
+
+def load_pharma_documents(database_path="database/pharma.json") -> DocumentStore:
+    """
+    Loads the pharma data from the JSON file into a DocumentStore: indexing it returns
+    the formatted text of a record (see format_pharma), and the structured routes read
+    the names and dose rates from its columns.
+    """
+    with open(database_path, 'r') as f:
+        pharma_data = json.load(f)
+    return build_pharma_store(pharma_data if isinstance(pharma_data, list) else [pharma_data])
 
 def load_pharma_structured_documents(database_path="database/pharma.json"):
     """
@@ -57,22 +68,97 @@ def load_pharma_structured_documents(database_path="database/pharma.json"):
     else:
         return [pharma_data]
 
-def format_pharma(item):
+# Name fields searched by dose rate lookups, in ranking priority order.
+NAME_FIELDS = ("Active Ingredient", "Ingredient", "Trade Name")
+
+# Match kinds in ranking order: the whole name, its first word, a prefix of the name,
+# anywhere inside the name.
+MATCH_EXACT, MATCH_FIRST_TOKEN, MATCH_PREFIX, MATCH_SUBSTRING = range(4)
+
+class PharmaNameIndex:
     """
-    Returns a formatted string representation of a pharma document.
-    Now includes the "metabolism_and_elimination" field.
+    Lookup structure over the Active Ingredient, Ingredient and Trade Name columns of the
+    pharma DocumentStore, built once so dose rate requests don't rescan the formulary.
+
+    - exact: lower-cased full name -> record ids
+    - first_token: first word of a name -> record ids
+    - trigrams: every 3-character substring of a name -> record ids
+
+    A one-word query matches names whose first word is that word; a longer query matches
+    names containing it, found by intersecting the trigram posting lists of the query and
+    checking only the records left. Either way the cost depends on the number of matches,
+    not on the size of the formulary.
     """
-    pharma_info = item.get("pharma_info", {})
-    text = (
-        f"Active Ingredient: {item.get('Active Ingredient', '')}\n"
-        f"Trade Name: {item.get('Trade Name', '')}\n"
-        f"Ingredient: {item.get('Ingredient', '')}\n"
-        f"Dose Rate: {pharma_info.get('dose_rate', '')}\n"
-        f"Indication: {pharma_info.get('indication', '')}\n"
-        f"Contraindication: {pharma_info.get('contraindication', '')}\n"
-        f"Food Timing: {pharma_info.get('food_timing', '')}\n"
-        f"Mechanism: {pharma_info.get('mechanism_of_action', '')}\n"
-        f"Metabolism and Elimination: {pharma_info.get('metabolism_and_elimination', '')}\n"
-        f"Products: {pharma_info.get('products', '')}"
-    )
-    return text
+    def __init__(self, store: DocumentStore):
+        self.store = store
+        self.names = []
+        self.exact = {}
+        self.first_token = {}
+        self.trigrams = {}
+        columns = [store.column(field) for field in NAME_FIELDS]
+        for doc_id in range(len(store)):
+            names = tuple((column[doc_id] or "").lower().strip() for column in columns)
+            self.names.append(names)
+            for name in set(names):
+                if not name:
+                    continue
+                self.exact.setdefault(name, set()).add(doc_id)
+                self.first_token.setdefault(name.split()[0], set()).add(doc_id)
+                for i in range(len(name) - 2):
+                    self.trigrams.setdefault(name[i:i + 3], set()).add(doc_id)
+
+    def _substring_candidates(self, query: str):
+        if len(query) < 3:
+            return range(len(self.store))
+        postings = [self.trigrams.get(query[i:i + 3]) for i in range(len(query) - 2)]
+        if not all(postings):
+            return ()
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def lookup_ids(self, ingredient_query: str):
+        """
+        Returns [(doc_id, match_kind, field_rank)] for every matching record, best match first:
+        by match kind (MATCH_EXACT ... MATCH_SUBSTRING), then by field in NAME_FIELDS order,
+        then by position in the formulary.
+        """
+        query = ingredient_query.lower().strip()
+        query_tokens = query.split()
+        if not query_tokens:
+            return []
+        if len(query_tokens) == 1:
+            candidates = self.first_token.get(query_tokens[0], ())
+        else:
+            candidates = self._substring_candidates(query)
+        ranked = []
+        for doc_id in candidates:
+            best = None
+            for field_rank, name in enumerate(self.names[doc_id]):
+                if not name:
+                    continue
+                if name == query:
+                    kind = MATCH_EXACT
+                elif len(query_tokens) == 1:
+                    if name.split()[0] != query_tokens[0]:
+                        continue
+                    kind = MATCH_FIRST_TOKEN
+                elif name.startswith(query):
+                    kind = MATCH_PREFIX
+                elif query in name:
+                    kind = MATCH_SUBSTRING
+                else:
+                    continue
+                if best is None or (kind, field_rank) < best:
+                    best = (kind, field_rank)
+            if best is not None:
+                ranked.append((best[0], best[1], doc_id))
+        ranked.sort()
+        return [(doc_id, kind, field_rank) for kind, field_rank, doc_id in ranked]
+
+    def lookup(self, ingredient_query: str):
+        """
+        Returns [(row, match_kind, field)] for every matching record, ranked like lookup_ids;
+        row is the record's fields as a dict (DocumentStore.row).
+        """
+        return [(self.store.row(doc_id), kind, NAME_FIELDS[field_rank])
+                for doc_id, kind, field_rank in self.lookup_ids(ingredient_query)]
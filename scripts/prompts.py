@@ -1,5 +1,10 @@
 from dotenv import load_dotenv
 import os
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from scripts.llm_cache import LLMResponseCache, make_cache_key
+from scripts.gemini import GeminiProvider
 load_dotenv()  # load environment variables from .env
 
 MODEL_NAME = "llama3.2"
@@ -62,42 +67,270 @@ Pharmaceutical Data:
 Answer:"""
     return prompt
 
+# Settings shared by the synchronous and asynchronous Gemini calls.
+GEMINI_GENERATION_CONFIG = {
+  "temperature": 0,
+  "top_p": 0.95,
+  "top_k": 64,
+  "max_output_tokens": 8192,
+  "response_mime_type": "application/json",
+}
+
+# One Gemini client for the whole process (see scripts/gemini.py).
+gemini_provider = GeminiProvider(GENI_MODEL_NAME, GEMINI_GENERATION_CONFIG)
+
+GEMINI_KEY_MISSING = "Gemini API key not found in environment variables."
+OLLAMA_NO_RESPONSE = "No response returned from the LLM."
+
+# Answers cached per (prompt, provider, model, generation config). VETLLM_LLM_CACHE_SIZE=0
+# disables the cache; VETLLM_LLM_CACHE_DB="" keeps it in memory only.
+llm_response_cache = LLMResponseCache(
+    max_size=int(os.environ.get("VETLLM_LLM_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.environ.get("VETLLM_LLM_CACHE_TTL", "86400")),
+    db_path=os.environ.get("VETLLM_LLM_CACHE_DB", "database/llm_cache.sqlite3") or None,
+)
+
+# Maximum concurrent generations per provider for the async layer; further calls wait in a queue.
+PROVIDER_CONCURRENCY = {
+    "Ollama": int(os.environ.get("VETLLM_OLLAMA_CONCURRENCY", "2")),
+    "Gemini": int(os.environ.get("VETLLM_GEMINI_CONCURRENCY", "8")),
+}
+
+def _ollama_response_text(response) -> str:
+    """
+    The answer of an ollama chat response: message.content, whether the client returned
+    a plain dict (older ollama releases) or a ChatResponse. The streaming path yields the
+    same field, so both paths cache the same text for a prompt.
+    """
+    if isinstance(response, dict):
+        message, text = response.get('message'), response.get('text')
+    else:
+        message, text = getattr(response, "message", None), getattr(response, "text", None)
+    content = message.get('content') if isinstance(message, dict) else getattr(message, "content", None)
+    if content is None:
+        content = text
+    if content is None:
+        return OLLAMA_NO_RESPONSE
+    return str(content).strip()
+
 def get_llm_response_ollama(prompt: str) -> str:
     import ollama
     response = ollama.chat(model=MODEL_NAME, messages=[{"role": "user", "content": prompt}])
-    if isinstance(response, dict):
-        response_text = response.get('text', '') or str(response.get('message', ''))
-    elif hasattr(response, "text"):
-        response_text = str(response.text)
-    elif hasattr(response, "message"):
-        response_text = str(response.message)
+    return _ollama_response_text(response)
+
+def get_llm_response_gemini(prompt: str, **settings) -> str:
+    if not gemini_provider.has_api_key():
+        return GEMINI_KEY_MISSING
+    return gemini_provider.generate(prompt, **settings)
+
+def llm_cache_key(prompt: str, provider: str) -> str:
+    if provider == "Gemini":
+        return make_cache_key(prompt, "Gemini", GENI_MODEL_NAME, GEMINI_GENERATION_CONFIG)
+    return make_cache_key(prompt, "Ollama", MODEL_NAME)
+
+def cacheable_response(response: str) -> bool:
+    # Don't keep configuration errors or empty answers around.
+    return bool(response) and response not in (GEMINI_KEY_MISSING, OLLAMA_NO_RESPONSE)
+
+def _cache_response(key: str, response: str):
+    if cacheable_response(response):
+        llm_response_cache.put(key, response)
+
+def get_llm_response(prompt: str, provider: str = "Ollama", cache_label: str = "default") -> str:
+    key = llm_cache_key(prompt, provider)
+    cached = llm_response_cache.get(key, cache_label)
+    if cached is not None:
+        return cached
+    if provider == "Gemini":
+        response = get_llm_response_gemini(prompt)
     else:
-        response_text = "No response returned from the LLM."
-    return response_text.strip()
-
-def get_llm_response_gemini(prompt: str) -> str:
-    import google.generativeai as genai
-    gemini_api_key = os.environ.get("GEMINI_API_KEY")
-    if not gemini_api_key:
-        return "Gemini API key not found in environment variables."
-    genai.configure(api_key=gemini_api_key)
-    generation_config = {
-      "temperature": 0,
-      "top_p": 0.95,
-      "top_k": 64,
-      "max_output_tokens": 8192,
-      "response_mime_type": "application/json",
-    }
-    model = genai.GenerativeModel(
-      model_name=GENI_MODEL_NAME,
-      generation_config=generation_config,
-    )
-    chat_session = model.start_chat(history=[])
-    response = chat_session.send_message(prompt)
-    return response.text.strip()
-
-def get_llm_response(prompt: str, provider: str = "Ollama") -> str:
+        response = get_llm_response_ollama(prompt)
+    _cache_response(key, response)
+    return response
+
+class AsyncLLMProvider(ABC):
+    """
+    Base class of the async providers, which implement _generate() (and _stream() if they
+    can stream). generate() admits at most `concurrency` calls at a time; the rest wait on
+    a semaphore, and the queue depth and wait times are recorded.
+    """
+    name = ""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._semaphore = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_generation_seconds = 0.0
+
+    async def _acquire(self) -> float:
+        """
+        Waits for a concurrency slot, counted in `waiting` meanwhile, and returns the time it
+        was granted; the caller releases self._semaphore. A task cancelled while queued (a
+        client that disconnected) is taken off the count as well.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.in_flight += 1
+        return started_at
+
+    def _release(self, started_at: float):
+        self.in_flight -= 1
+        self.total_generation_seconds += time.perf_counter() - started_at
+        self._semaphore.release()
+
+    async def generate(self, prompt: str) -> str:
+        started_at = await self._acquire()
+        try:
+            result = await self._generate(prompt)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._release(started_at)
+
+    async def stream(self, prompt: str):
+        """
+        Async generator yielding text chunks as the provider produces them. The concurrency
+        slot is held until the stream is exhausted or closed.
+        """
+        started_at = await self._acquire()
+        try:
+            async for chunk in self._stream(prompt):
+                yield chunk
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._release(started_at)
+
+    @abstractmethod
+    async def _generate(self, prompt: str) -> str:
+        """
+        Returns the provider's answer to prompt.
+        """
+
+    async def _stream(self, prompt: str):
+        # Providers without a streaming API yield the whole answer at once.
+        yield await self._generate(prompt)
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": self.total_wait_seconds / finished if finished else 0.0,
+            "avg_generation_seconds": self.total_generation_seconds / finished if finished else 0.0,
+        }
+
+class AsyncOllamaProvider(AsyncLLMProvider):
+    """
+    Ollama through a single ollama.AsyncClient, whose HTTP connection pool is reused by
+    every request (host taken from OLLAMA_HOST, as for the synchronous client).
+    """
+    name = "Ollama"
+
+    def __init__(self, concurrency: int):
+        super().__init__(concurrency)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import ollama
+            self._client = ollama.AsyncClient()
+        return self._client
+
+    async def _generate(self, prompt: str) -> str:
+        response = await self._get_client().chat(model=MODEL_NAME, messages=[{"role": "user", "content": prompt}])
+        return _ollama_response_text(response)
+
+    async def _stream(self, prompt: str):
+        parts = await self._get_client().chat(
+            model=MODEL_NAME, messages=[{"role": "user", "content": prompt}], stream=True
+        )
+        async for part in parts:
+            content = part["message"]["content"]
+            if content:
+                yield content
+
+class AsyncGeminiProvider(AsyncLLMProvider):
+    """
+    Gemini through the shared GeminiProvider, so async calls reuse its client and connections.
+    """
+    name = "Gemini"
+
+    async def _generate(self, prompt: str) -> str:
+        if not gemini_provider.has_api_key():
+            return GEMINI_KEY_MISSING
+        return await gemini_provider.agenerate(prompt)
+
+    async def _stream(self, prompt: str):
+        if not gemini_provider.has_api_key():
+            yield GEMINI_KEY_MISSING
+            return
+        async for chunk in gemini_provider.astream(prompt):
+            yield chunk
+
+async_providers = {
+    "Ollama": AsyncOllamaProvider(PROVIDER_CONCURRENCY["Ollama"]),
+    "Gemini": AsyncGeminiProvider(PROVIDER_CONCURRENCY["Gemini"]),
+}
+
+async def get_llm_response_async(prompt: str, provider: str = "Ollama", cache_label: str = "default") -> str:
+    """
+    Async counterpart of get_llm_response: awaits the generation without holding a worker
+    thread, subject to the provider's concurrency limit. Cache lookups and stores, which may
+    touch SQLite, run in a worker thread.
+    """
+    key = llm_cache_key(prompt, provider)
+    cached = await asyncio.to_thread(llm_response_cache.get, key, cache_label)
+    if cached is not None:
+        return cached
     if provider == "Gemini":
-        return get_llm_response_gemini(prompt)
+        response = await async_providers["Gemini"].generate(prompt)
     else:
-        return get_llm_response_ollama(prompt)
+        response = await async_providers["Ollama"].generate(prompt)
+    await asyncio.to_thread(_cache_response, key, response)
+    return response
+
+async def stream_llm_response(prompt: str, provider: str = "Ollama", cache_label: str = "default"):
+    """
+    Async generator of response text chunks from the provider's streaming API. A cached
+    answer is sent as a single chunk; a completed stream is stored in the cache.
+    """
+    key = llm_cache_key(prompt, provider)
+    cached = await asyncio.to_thread(llm_response_cache.get, key, cache_label)
+    if cached is not None:
+        yield cached
+        return
+    selected = async_providers["Gemini"] if provider == "Gemini" else async_providers["Ollama"]
+    chunks = []
+    async for chunk in selected.stream(prompt):
+        chunks.append(chunk)
+        yield chunk
+    await asyncio.to_thread(_cache_response, key, "".join(chunks).strip())
+
+def llm_provider_stats() -> dict:
+    stats = {name: provider.stats() for name, provider in async_providers.items()}
+    stats["Gemini"]["client"] = gemini_provider.stats()
+    return stats
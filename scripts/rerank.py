@@ -0,0 +1,165 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+class CandidateReranker:
+    """
+    Optional second stage for hybrid_search: a FlashRank cross-encoder rescoring the top_n
+    fused candidates, so the best passage (the one that becomes the LLM context) is picked
+    by query-document relevance rather than by the linear score blend alone.
+
+    - Margin skip: when the first candidate's hybrid_score beats the second by at least
+      `margin`, the fused order is kept and the cross-encoder is not run.
+    - Cache: scores are kept per (collection, query, doc id) in an LRU of cache_size
+      entries, so only passages not scored before for a query go to the model.
+    - Budget: the model runs on a worker thread and the caller waits at most budget_ms;
+      on timeout the fused order is returned and the job is cancelled if it hasn't
+      started. One already running still caches its scores for the next identical query.
+    - Backlog: at most max_pending jobs are queued or running at once; past that the
+      fused order is returned without submitting, so a slow model under load can't build
+      up a queue of jobs whose callers have already given up.
+
+    flashrank is imported on first use; if it (or its model) is unavailable the reranker
+    reports the error in stats() and leaves results unchanged.
+    """
+    def __init__(self, model_name: str = "ms-marco-TinyBERT-L-2-v2", top_n: int = 5, budget_ms: float = 150.0,
+                 margin: float = 0.15, cache_size: int = 4096, max_workers: int = 2,
+                 max_pending: int = 4):
+        self.model_name = model_name
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self.margin = margin
+        self.cache_size = cache_size
+        self.max_pending = max_pending
+        self._pending = 0
+        self._ranker = None
+        self._ranker_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rerank")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.error = None
+        self.counts = {"reranked": 0, "cached": 0, "skipped_margin": 0, "timeout": 0,
+                       "skipped_busy": 0, "error": 0}
+        self.total_model_ms = 0.0
+        self.model_calls = 0
+
+    def _get_ranker(self):
+        if self._ranker is None:
+            with self._ranker_lock:
+                if self._ranker is None:
+                    from flashrank import Ranker
+                    self._ranker = Ranker(model_name=self.model_name)
+        return self._ranker
+
+    def warm(self) -> bool:
+        """
+        Loads the model ahead of the first request; returns False (and records the error) if it can't.
+        """
+        try:
+            self._get_ranker()
+            return True
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"Reranker unavailable, results will keep the fused order: {self.error}")
+            return False
+
+    def _score(self, query: str, cache_keys: list, passages: list) -> dict:
+        """
+        Runs the cross-encoder on passages and caches the scores; returns {doc id: score}.
+        """
+        from flashrank import RerankRequest
+        start = time.perf_counter()
+        results = self._get_ranker().rerank(RerankRequest(query=query, passages=passages))
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        scores = {result["id"]: float(result["score"]) for result in results}
+        with self._lock:
+            self.total_model_ms += elapsed_ms
+            self.model_calls += 1
+            for key, passage in zip(cache_keys, passages):
+                self._remember(key, scores[passage["id"]])
+        return scores
+
+    def _remember(self, key: tuple, score: float):
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _job_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _count(self, status: str):
+        with self._lock:
+            self.counts[status] += 1
+
+    def rerank(self, query: str, collection: str, candidates: list, timings: dict = None) -> list:
+        """
+        Returns candidates reordered by cross-encoder score (top_n of them; the rest keep
+        their place after those), each reranked one with a "rerank_score". Adds
+        "rerank" (status) and "rerank_ms" to timings when given.
+        """
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
+        status = self._rerank(query, collection, candidates)
+        timings["rerank"] = status
+        timings["rerank_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+        return candidates
+
+    def _rerank(self, query: str, collection: str, candidates: list) -> str:
+        if len(candidates) < 2:
+            return "skipped_single"
+        if candidates[0]["hybrid_score"] - candidates[1]["hybrid_score"] >= self.margin:
+            self._count("skipped_margin")
+            return "skipped_margin"
+        if self.error is not None and self._ranker is None:
+            # The model never loaded (flashrank missing or model download failed).
+            self._count("error")
+            return "error"
+        top = candidates[:self.top_n]
+        keys = [(collection, query, int(cand["id"])) for cand in top]
+        with self._lock:
+            scores = {key[2]: self._cache[key] for key in keys if key in self._cache}
+        missing = [(key, cand) for key, cand in zip(keys, top) if key[2] not in scores]
+        status = "cached"
+        if missing:
+            passages = [{"id": key[2], "text": cand["text"]} for key, cand in missing]
+            with self._lock:
+                if self._pending >= self.max_pending:
+                    self.counts["skipped_busy"] += 1
+                    return "skipped_busy"
+                self._pending += 1
+            future = self._executor.submit(self._score, query, [key for key, _ in missing], passages)
+            future.add_done_callback(self._job_done)
+            try:
+                scores.update(future.result(timeout=self.budget_ms / 1000.0))
+            except TimeoutError:
+                future.cancel()
+                self._count("timeout")
+                return "timeout"
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                self._count("error")
+                return "error"
+            status = "reranked"
+        self._count(status)
+        for cand in top:
+            cand["rerank_score"] = scores[int(cand["id"])]
+        candidates[:len(top)] = sorted(top, key=lambda cand: cand["rerank_score"], reverse=True)
+        return status
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "top_n": self.top_n,
+                "budget_ms": self.budget_ms,
+                "margin": self.margin,
+                "cache_size": len(self._cache),
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "counts": dict(self.counts),
+                "avg_model_ms": self.total_model_ms / self.model_calls if self.model_calls else 0.0,
+                "error": self.error,
+            }
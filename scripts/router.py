@@ -0,0 +1,86 @@
+import os
+import threading
+
+# Keywords routing a query to a collection. A query goes to the category with the most
+# keyword matches (overlapping matches count separately), "clinical" if none match.
+pharma_keywords = [
+    "indication", "tradename", "brand name", "active ingredient", "dose rate",
+    "dosage", "administration", "contraindication", "food timing",
+    "meal timing", "mechanism", "mechanism of action", "products"
+]
+clinical_keywords = [
+    "line of treatment", "treatment plan", "treatment protocol", "synonyms",
+    "drug of choice", "preferred drug", "differential diagnosis",
+    "diagnostic differentials", "management"
+]
+disease_keywords = [
+    "symptoms", "clinical signs", "manifestations", "presentation",
+    "signs and symptoms", "symptomatology"
+]
+CATEGORY_KEYWORDS = {
+    "pharma": pharma_keywords,
+    "clinical": clinical_keywords,
+    "disease": disease_keywords,
+}
+DEFAULT_CATEGORY = "clinical"
+
+# Router implementations, selected with VETLLM_ROUTER:
+#   spacy      full en_core_web_sm pipeline + PhraseMatcher (the original router)
+#   tokenizer  spacy.blank("en") tokenizer + PhraseMatcher; same tokens, no model to load
+# "tokenizer" must find the same matches as "spacy" on every query: tests/test_router.py
+# and `python -m benchmarks.bench_router` (non-zero exit on any mismatch) check this.
+ROUTER_MODES = ("spacy", "tokenizer")
+ROUTER_MODE = os.environ.get("VETLLM_ROUTER", "spacy")
+
+def pick_category(counts: dict) -> str:
+    if all(v == 0 for v in counts.values()):
+        return DEFAULT_CATEGORY
+    return max(counts, key=counts.get)
+
+class PhraseMatcherRouter:
+    """
+    Keyword matching with spaCy's PhraseMatcher. With model=None only a blank English
+    tokenizer is created; otherwise the named pipeline is loaded and run on every query.
+    Patterns only need tokens, so they are built with make_doc in both cases.
+    """
+    def __init__(self, model: str = None):
+        import spacy
+        from spacy.matcher import PhraseMatcher
+        self.nlp = spacy.load(model) if model else spacy.blank("en")
+        self.run_pipeline = model is not None
+        self.matcher = PhraseMatcher(self.nlp.vocab)
+        for label, keywords in CATEGORY_KEYWORDS.items():
+            self.matcher.add(label, [self.nlp.make_doc(keyword) for keyword in keywords])
+
+    def counts(self, query: str) -> dict:
+        text = query.lower()
+        doc = self.nlp(text) if self.run_pipeline else self.nlp.make_doc(text)
+        counts = dict.fromkeys(CATEGORY_KEYWORDS, 0)
+        for match_id, start, end in self.matcher(doc):
+            counts[self.nlp.vocab.strings[match_id]] += 1
+        return counts
+
+    def route(self, query: str) -> str:
+        return pick_category(self.counts(query))
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+def get_router(mode: str = None):
+    """
+    Returns the router for mode (default: VETLLM_ROUTER), creating it on first use.
+    """
+    mode = mode or ROUTER_MODE
+    if mode not in ROUTER_MODES:
+        raise ValueError(f"Unknown router '{mode}'. Expected one of: {', '.join(ROUTER_MODES)}.")
+    router = _routers.get(mode)
+    if router is None:
+        with _routers_lock:
+            router = _routers.get(mode)
+            if router is None:
+                router = PhraseMatcherRouter("en_core_web_sm" if mode == "spacy" else None)
+                _routers[mode] = router
+    return router
+
+def determine_category(query: str, mode: str = None) -> str:
+    return get_router(mode).route(query)
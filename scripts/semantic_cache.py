@@ -0,0 +1,119 @@
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+import faiss
+
+# Species words that change the answer to an otherwise identical question, by the species
+# they name. Embeddings of "meloxicam dose for cats" and "... for dogs" are near-identical.
+SPECIES_TERMS = {
+    "dog": "dog", "dogs": "dog", "canine": "dog", "canines": "dog", "puppy": "dog", "puppies": "dog",
+    "cat": "cat", "cats": "cat", "feline": "cat", "felines": "cat", "kitten": "cat", "kittens": "cat",
+    "horse": "horse", "horses": "horse", "equine": "horse", "foal": "horse", "foals": "horse", "pony": "horse",
+    "ponies": "horse", "mare": "horse", "stallion": "horse",
+    "cattle": "cattle", "cow": "cattle", "cows": "cattle", "bovine": "cattle", "calf": "cattle", "calves": "cattle",
+    "bull": "cattle", "heifer": "cattle",
+    "sheep": "sheep", "ovine": "sheep", "lamb": "sheep", "lambs": "sheep", "ewe": "sheep",
+    "goat": "goat", "goats": "goat", "caprine": "goat",
+    "pig": "pig", "pigs": "pig", "swine": "pig", "porcine": "pig", "piglet": "pig", "piglets": "pig", "sow": "pig",
+    "rabbit": "rabbit", "rabbits": "rabbit",
+    "ferret": "ferret", "ferrets": "ferret",
+    "bird": "bird", "birds": "bird", "avian": "bird", "poultry": "bird", "chicken": "bird", "chickens": "bird",
+    "rodent": "rodent", "rodents": "rodent", "rat": "rodent", "rats": "rodent", "mouse": "rodent", "mice": "rodent",
+    "hamster": "rodent", "hamsters": "rodent", "guinea": "rodent",
+    "reptile": "reptile", "reptiles": "reptile", "snake": "reptile", "snakes": "reptile", "lizard": "reptile",
+    "tortoise": "reptile", "turtle": "reptile",
+    "fish": "fish",
+}
+
+def query_entities(query: str) -> tuple:
+    """
+    The parts of a query an answer depends on that embeddings barely tell apart: the
+    species it names and the numbers in it (weights, ages, doses). Sorted, so word order
+    does not matter: "cat, 4 kg" and "4 kg cat" give (("cat",), ("4",)).
+    """
+    words = re.findall(r"[a-z]+", query.lower())
+    species = sorted({SPECIES_TERMS[word] for word in words if word in SPECIES_TERMS})
+    numbers = sorted({str(float(number)).rstrip("0").rstrip(".") for number in re.findall(r"\d+(?:\.\d+)?", query)})
+    return tuple(species), tuple(numbers)
+
+class SemanticAnswerCache:
+    """
+    Reuses LLM answers for near-duplicate questions ("prognosis for parvo" vs "parvovirus prognosis").
+
+    Each answered query is stored with its embedding and a scope: (category, sub_endpoint,
+    best-matching document id, provider, query_entities of the query). A new query gets the
+    stored answer when it has the same scope and the cosine similarity of the embeddings is at least `threshold`. Each scope
+    has its own small inner-product FAISS index over L2-normalized vectors, so a lookup only
+    compares against answers it could reuse; at most max_size answers are kept in total,
+    least recently used first out.
+    """
+    def __init__(self, threshold: float = 0.92, max_size: int = 2048):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._indexes = {}
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.saved_calls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.array(vector, dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, vector, scope: tuple):
+        """
+        Returns the stored answer for a near-duplicate query with the same scope, or None.
+        """
+        if not self.enabled:
+            return None
+        query = self._normalize(vector)
+        with self._lock:
+            self.lookups += 1
+            index_obj = self._indexes.get(scope)
+            if index_obj is None:
+                return None
+            similarities, ids = index_obj.search(query, 1)
+            if similarities[0][0] < self.threshold:
+                return None
+            entry_id = int(ids[0][0])
+            self._entries.move_to_end(entry_id)
+            self.saved_calls += 1
+            return self._entries[entry_id][1]
+
+    def store(self, vector, scope: tuple, answer: str):
+        if not self.enabled:
+            return
+        query = self._normalize(vector)
+        with self._lock:
+            index_obj = self._indexes.get(scope)
+            if index_obj is None:
+                index_obj = self._indexes[scope] = faiss.IndexIDMap2(faiss.IndexFlatIP(query.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            index_obj.add_with_ids(query, np.array([entry_id], dtype='int64'))
+            self._entries[entry_id] = (scope, answer)
+            if len(self._entries) > self.max_size:
+                evicted_id, (evicted_scope, _) = self._entries.popitem(last=False)
+                evicted_index = self._indexes[evicted_scope]
+                evicted_index.remove_ids(np.array([evicted_id], dtype='int64'))
+                if evicted_index.ntotal == 0:
+                    del self._indexes[evicted_scope]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "scopes": len(self._indexes),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "saved_llm_calls": self.saved_calls,
+            }
@@ -0,0 +1,93 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class StartupLoader:
+    """
+    Loads named startup components (models, collections, indexes) concurrently on a thread pool.
+
+    Each component is a function registered with register(name, fn). Its return value is kept
+    in results, its wall time in timings, and any exception in errors, so one failing component
+    does not keep the others from serving. Routes check ready(...) for just the components
+    they need.
+    """
+    def __init__(self, max_workers: int = 6):
+        self.max_workers = max_workers
+        self._components = {}
+        self._events = {}
+        self.results = {}
+        self.timings = {}
+        self.errors = {}
+        self.started_at = None
+        self.finished_at = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, fn):
+        self._components[name] = fn
+        self._events[name] = threading.Event()
+
+    def _run(self, name: str):
+        start = time.perf_counter()
+        try:
+            self.results[name] = self._components[name]()
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            print(f"Startup: {name} failed after {time.perf_counter() - start:.2f}s: {self.errors[name]}")
+        else:
+            print(f"Startup: {name} loaded in {time.perf_counter() - start:.2f}s")
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+            self._events[name].set()
+            self._check_finished()
+
+    def _check_finished(self):
+        with self._lock:
+            if self.finished_at is None and all(event.is_set() for event in self._events.values()):
+                self.finished_at = time.perf_counter()
+                status = "ready" if not self.errors else f"finished with {len(self.errors)} failed component(s)"
+                print(f"Startup: {status}; cold start took {self.finished_at - self.started_at:.2f}s")
+
+    def start(self, background: bool = True):
+        """
+        Starts loading every registered component. With background=False, blocks until all have finished.
+        """
+        self.started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup")
+        for name in self._components:
+            self._executor.submit(self._run, name)
+        self._executor.shutdown(wait=not background)
+
+    def ready(self, *names) -> bool:
+        names = names or tuple(self._components)
+        return all(self._events[name].is_set() and name not in self.errors for name in names)
+
+    def pending(self, *names) -> list:
+        """
+        The named components still loading. Failed components are not pending: see failed().
+        """
+        names = names or tuple(self._components)
+        return [name for name in names if not self._events[name].is_set()]
+
+    def failed(self, *names) -> dict:
+        """
+        {name: error} for the named components whose loader raised; they will not become ready.
+        """
+        names = names or tuple(self._components)
+        return {name: self.errors[name] for name in names if name in self.errors}
+
+    def status(self) -> dict:
+        components = {}
+        for name, event in self._events.items():
+            if name in self.errors:
+                state = "failed"
+            elif event.is_set():
+                state = "ready"
+            else:
+                state = "loading"
+            components[name] = {"status": state, "seconds": self.timings.get(name), "error": self.errors.get(name)}
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.perf_counter()) - self.started_at, 3)
+        return {"ready": self.ready(), "loading": self.pending(), "failed": sorted(self.failed()),
+                "elapsed_seconds": elapsed, "components": components}
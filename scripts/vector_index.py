@@ -0,0 +1,157 @@
+import os
+import json
+import faiss
+import numpy as np
+
+# Read-only memory mapping of a serialized index. IO_FLAG_MMAP_IFC (faiss >= 1.8) maps the
+# codes of flat indexes; older releases only map IVF inverted lists and read the rest in.
+MMAP_IO_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+# Index types accepted by build_index, with their default build and search parameters.
+#   flat   exact IndexFlatL2
+#   hnsw   IndexHNSWFlat         build: M, efConstruction   search: efSearch
+#   ivf    IndexIVFFlat          build: nlist               search: nprobe
+#   ivfpq  IndexIVFPQ            build: nlist, m, nbits     search: nprobe
+# Compressed exact-scan indexes, trading recall for memory per vector (768 dimensions):
+#   fp16   IndexScalarQuantizer, float16 components            1536 bytes
+#   sq8    IndexScalarQuantizer, 8-bit components               768 bytes
+#   sq4    IndexScalarQuantizer, 4-bit components               384 bytes
+#   pq     IndexPQ               build: m, nbits                m * nbits / 8 bytes
+INDEX_TYPES = {
+    "flat": {},
+    "hnsw": {"M": 32, "efConstruction": 80, "efSearch": 64},
+    "ivf": {"nlist": 64, "nprobe": 8},
+    "ivfpq": {"nlist": 64, "m": 48, "nbits": 8, "nprobe": 8},
+    "fp16": {},
+    "sq8": {},
+    "sq4": {},
+    "pq": {"m": 96, "nbits": 8},
+}
+SCALAR_QUANTIZERS = {"fp16": "QT_fp16", "sq8": "QT_8bit", "sq4": "QT_4bit"}
+SEARCH_PARAMS = {"efSearch", "nprobe"}
+
+def parse_index_spec(spec: str = "flat"):
+    """
+    Parses an index spec such as "flat", "hnsw:M=32,efSearch=128" or "ivfpq:nlist=256,m=48,nprobe=16"
+    into (kind, params), with unspecified parameters taken from INDEX_TYPES.
+    """
+    kind, _, arguments = (spec or "flat").strip().partition(":")
+    kind = kind.strip().lower()
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{kind}'. Expected one of: {', '.join(INDEX_TYPES)}.")
+    params = dict(INDEX_TYPES[kind])
+    for argument in filter(None, (a.strip() for a in arguments.split(","))):
+        name, _, value = argument.partition("=")
+        if name not in params:
+            raise ValueError(f"Unknown parameter '{name}' for index type '{kind}'.")
+        params[name] = int(value)
+    return kind, params
+
+def index_name(kind: str, params: dict) -> str:
+    """
+    File-name tag for the build parameters of an index; search parameters are applied at
+    load time and do not require a rebuild. For example "hnsw-M32-efConstruction80".
+    """
+    build_params = [f"{name}{value}" for name, value in sorted(params.items()) if name not in SEARCH_PARAMS]
+    return "-".join([kind] + build_params)
+
+def index_filename(cache_filename: str, name: str = "flat") -> str:
+    """
+    database/embeddings_pharma.npy -> database/embeddings_pharma.flat.faiss
+    """
+    return f"{os.path.splitext(cache_filename)[0]}.{name}.faiss"
+
+def pq_nbits(nbits: int, num_vectors: int) -> int:
+    # Product quantizer codebooks are trained with k-means; faiss needs at least 2**nbits points.
+    return min(nbits, max(1, num_vectors.bit_length() - 1))
+
+def create_index(embeddings, kind: str = "flat", params: dict = None):
+    # Embeddings may be stored as float16 (see scripts/embedding_store.py); faiss takes float32.
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    num_vectors, dimension = embeddings.shape
+    params = params or {}
+    if kind == "flat":
+        index_obj = faiss.IndexFlatL2(dimension)
+    elif kind == "hnsw":
+        index_obj = faiss.IndexHNSWFlat(dimension, params["M"])
+        index_obj.hnsw.efConstruction = params["efConstruction"]
+    elif kind in ("ivf", "ivfpq"):
+        # A list per training point at most; faiss cannot train more centroids than vectors.
+        nlist = max(1, min(params["nlist"], num_vectors))
+        quantizer = faiss.IndexFlatL2(dimension)
+        if kind == "ivf":
+            index_obj = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+        else:
+            if dimension % params["m"]:
+                raise ValueError(f"ivfpq m={params['m']} must divide the embedding dimension {dimension}.")
+            index_obj = faiss.IndexIVFPQ(quantizer, dimension, nlist, params["m"],
+                                         pq_nbits(params["nbits"], num_vectors))
+        index_obj.train(embeddings)
+    elif kind in SCALAR_QUANTIZERS:
+        qtype = getattr(faiss.ScalarQuantizer, SCALAR_QUANTIZERS[kind])
+        index_obj = faiss.IndexScalarQuantizer(dimension, qtype, faiss.METRIC_L2)
+        index_obj.train(embeddings)
+    elif kind == "pq":
+        if dimension % params["m"]:
+            raise ValueError(f"pq m={params['m']} must divide the embedding dimension {dimension}.")
+        index_obj = faiss.IndexPQ(dimension, params["m"], pq_nbits(params["nbits"], num_vectors))
+        index_obj.train(embeddings)
+    else:
+        raise ValueError(f"Unknown index type '{kind}'.")
+    index_obj.add(embeddings)
+    apply_search_params(index_obj, kind, params)
+    return index_obj
+
+def apply_search_params(index_obj, kind: str, params: dict):
+    if kind == "hnsw":
+        index_obj.hnsw.efSearch = params["efSearch"]
+    elif kind in ("ivf", "ivfpq"):
+        index_obj.nprobe = params["nprobe"]
+
+def _index_is_current(path: str, source_digest: str) -> bool:
+    if not os.path.exists(path) or not os.path.exists(f"{path}.json"):
+        return False
+    try:
+        with open(f"{path}.json", "r") as f:
+            return json.load(f).get("source") == source_digest
+    except (OSError, ValueError):
+        return False
+
+def write_index(index_obj, path: str, source_digest: str):
+    """
+    Serializes the index next to the embeddings, together with the digest of the
+    embeddings it was built from. Temporary files + os.replace keep concurrent
+    workers from reading a partial file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    faiss.write_index(index_obj, tmp_path)
+    with open(f"{tmp_path}.json", "w") as f:
+        json.dump({"source": source_digest, "ntotal": int(index_obj.ntotal)}, f)
+    os.replace(tmp_path, path)
+    os.replace(f"{tmp_path}.json", f"{path}.json")
+
+def load_or_build_index(embeddings, cache_filename: str, source_digest: str, mmap: bool = False,
+                        index_spec: str = "flat"):
+    """
+    Returns a FAISS index over embeddings, of the type described by index_spec.
+
+    A flat index without mmap is built in process memory as before. Every other index is
+    serialized next to the embeddings once (trained indexes are not retrained at startup)
+    and rebuilt only when the embeddings or build parameters change. With mmap every process
+    opens it read-only through a memory map, so uvicorn workers share its pages.
+    """
+    kind, params = parse_index_spec(index_spec)
+    if kind == "flat" and not mmap:
+        return create_index(embeddings)
+    path = index_filename(cache_filename, index_name(kind, params))
+    if not _index_is_current(path, source_digest):
+        print(f"Building {kind} FAISS index and writing it to {path}...")
+        write_index(create_index(embeddings, kind, params), path, source_digest)
+    if mmap:
+        print(f"Memory-mapping FAISS index from {path}...")
+        index_obj = faiss.read_index(path, MMAP_IO_FLAGS)
+    else:
+        print(f"Loading FAISS index from {path}...")
+        index_obj = faiss.read_index(path)
+    apply_search_params(index_obj, kind, params)
+    return index_obj
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+from email.utils import formatdate
+
+import pytest
+
+from scripts.catalog import Catalog, build_pharma_catalog, build_disease_catalog
+from scripts.pharma import build_pharma_store
+
+CLINICAL = [
+    {"Clinical Case": {"Disease": " Canine parvovirus "}},
+    {"Clinical Case": {}},
+    {"Clinical Case": {"Disease": "Feline asthma"}},
+]
+
+def write_json(path, data, mtime=None):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "clinical_data.json"
+    write_json(path, CLINICAL, mtime=1_700_000_000)
+    catalog = Catalog({"diseases": (str(path), build_disease_catalog)}, poll_interval=0)
+    catalog.load()
+    return catalog, path
+
+def test_entry_validators(catalog):
+    catalog, path = catalog
+    entry = catalog.get("diseases")
+    assert entry.data == {"diseases": ["Canine parvovirus", "Feline asthma"]}
+    assert entry.etag == '"' + hashlib.sha1(path.read_bytes()).hexdigest() + '"'
+    assert entry.last_modified == 1_700_000_000
+
+def test_if_none_match(catalog):
+    entry = catalog[0].get("diseases")
+    assert entry.not_modified(entry.etag)
+    assert entry.not_modified(f"W/{entry.etag}")
+    assert entry.not_modified(f'"other", {entry.etag}')
+    assert entry.not_modified("*")
+    assert not entry.not_modified('"other"')
+    # If-None-Match takes precedence over If-Modified-Since.
+    assert not entry.not_modified('"other"', formatdate(1_800_000_000, usegmt=True))
+
+def test_if_modified_since(catalog):
+    entry = catalog[0].get("diseases")
+    assert entry.not_modified(None, formatdate(1_700_000_000, usegmt=True))
+    assert entry.not_modified(None, formatdate(1_700_000_100, usegmt=True))
+    assert not entry.not_modified(None, formatdate(1_699_999_999, usegmt=True))
+    assert not entry.not_modified(None, "not a date")
+    assert not entry.not_modified()
+
+def test_reload_changes_validators(catalog):
+    catalog, path = catalog
+    old = catalog.get("diseases")
+    write_json(path, CLINICAL[:1], mtime=1_700_000_500)
+    assert catalog.refresh() == ["diseases"]
+    entry = catalog.get("diseases")
+    assert entry.data == {"diseases": ["Canine parvovirus"]}
+    assert not entry.not_modified(old.etag)
+    assert not entry.not_modified(None, formatdate(old.last_modified, usegmt=True))
+    assert catalog.refresh() == []
+
+def test_failed_reload_keeps_previous_entry(catalog):
+    catalog, path = catalog
+    old = catalog.get("diseases")
+    path.write_text("[{")
+    assert catalog.refresh() == []
+    assert catalog.get("diseases") is old
+    assert catalog.stats()["catalogs"]["diseases"]["error"].startswith("JSONDecodeError")
+
+def test_pharma_catalog_from_store():
+    store = build_pharma_store([
+        {"Ingredient": "Meloxicam", "pharma_info": {"dose_rate": {"Dogs": "0.1 mg/kg", "Cats": "0.05 mg/kg"}}},
+        {"Ingredient": "meloxicam", "pharma_info": {"dose_rate": {"Horses": "0.6 mg/kg"}}},
+        {"Ingredient": " Amoxicillin ", "pharma_info": {}},
+        {"Ingredient": "", "pharma_info": {"dose_rate": {"Dogs": "1 mg/kg"}}},
+    ])
+    assert build_pharma_catalog(store) == {
+        "ingredients": ["Amoxicillin", "Meloxicam", "meloxicam"],
+        "species": {"meloxicam": ["Cats", "Dogs", "Horses"], "amoxicillin": []},
+    }
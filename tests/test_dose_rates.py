@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+import pytest
+
+from scripts.dose_rates import (
+    parse_dose_rate, parse_source_dose_rate, normalize_species, format_amount, DoseRateTable,
+    BASE_UNITS, SOURCE_UNITS, NO_UNIT,
+)
+
+@pytest.mark.parametrize("text, expected", [
+    ("5-10 mg/kg", (5.0, 10.0, "mg")),
+    ("0.5 mg/kg every 12 hours", (0.5, 0.5, "mg")),
+    ("5 to 10 mg / kg PO", (5.0, 10.0, "mg")),
+    ("5 – 10 MG/KG", (5.0, 10.0, "mg")),
+    ("10 - 5 mg/kg", (5.0, 10.0, "mg")),
+    (".5 mg/kg", (0.5, 0.5, "mg")),
+    ("10,000 - 20,000 IU/kg", (10000.0, 20000.0, "IU")),
+    ("2 U/kg", (2.0, 2.0, "U")),
+    ("1-2 ml/kg", (1.0, 2.0, "mL")),
+    ("Loading dose: 20 mg/kg, then 10 mg/kg", (20.0, 20.0, "mg")),
+])
+def test_parse_dose_rate(text, expected):
+    assert parse_dose_rate(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("50-100 mcg/kg", (0.05, 0.1, "mg")),
+    ("50 µg/kg", (0.05, 0.05, "mg")),
+    ("50 ug/kg", (0.05, 0.05, "mg")),
+    ("0.1-0.2 g/kg", (100.0, 200.0, "mg")),
+    ("0.01 L/kg", (10.0, 10.0, "mL")),
+])
+def test_parse_dose_rate_converts_to_base_unit(text, expected):
+    low, high, unit = parse_dose_rate(text)
+    assert (low, high) == pytest.approx(expected[:2])
+    assert unit == expected[2]
+
+@pytest.mark.parametrize("text, expected", [
+    ("1-5 mcg/kg", (1.0, 5.0, "mcg")),
+    ("50 µg/kg", (50.0, 50.0, "mcg")),
+    ("0.1-0.2 g/kg", (0.1, 0.2, "g")),
+    ("0.01 l/kg", (0.01, 0.01, "L")),
+    ("2 ml/kg", (2.0, 2.0, "mL")),
+    ("20,000 to 30,000 iu/kg", (20000.0, 30000.0, "IU")),
+])
+def test_parse_source_dose_rate_keeps_unit(text, expected):
+    assert parse_source_dose_rate(text) == expected
+
+@pytest.mark.parametrize("text", ["Not applicable", "2% solution", "1-2 mg/L", "10 mg", "", None])
+def test_parse_dose_rate_rejects_non_per_kg(text):
+    assert parse_dose_rate(text) is None
+    assert parse_source_dose_rate(text) is None
+
+def test_normalize_species():
+    assert normalize_species(" Dogs ") == "dog"
+    assert normalize_species("cats") == "cat"
+    assert normalize_species("Horses") == "horse"
+    assert normalize_species("bass") == "bass"
+    assert normalize_species("pigs") == "pig"
+
+def test_format_amount():
+    assert format_amount(5.0, 5.0) == "5"
+    assert format_amount(5.0, 10.0) == "5-10"
+    assert format_amount(0.05, 0.1) == "0.05-0.1"
+    # 20,000-30,000 IU/kg for a 500 kg horse.
+    assert format_amount(1e7, 1.5e7) == "10000000-15000000"
+    assert format_amount(1234567.0, 1234567.0) == "1234567"
+    assert format_amount(0.000123, 1 / 3) == "0.000123-0.333333"
+    assert format_amount(0.1 * 3, 0.1 * 3) == "0.3"
+
+@pytest.fixture
+def table():
+    return DoseRateTable([
+        {"Dogs": "5-10 mg/kg", "Cats": "50 mcg/kg"},
+        None,
+        {"dog": "Not applicable", "Horse": "2 mL/kg"},
+        "",
+        {"dog": "1 mg/kg", "Dogs": "2 mg/kg"},
+    ])
+
+def test_table_rows(table):
+    assert table.species == ["dog", "cat", "horse"]
+    assert len(table.table) == 6
+    assert table.texts[1] == "50 mcg/kg"
+    row = table.row(0, "dog")
+    assert (table.table["min"][row], table.table["max"][row]) == (5.0, 10.0)
+    assert BASE_UNITS[table.table["unit"][row]] == "mg"
+    assert table.table["min"][table.row(0, "Cats")] == pytest.approx(0.05)
+    unparsed = table.row(2, "Dogs")
+    assert math.isnan(table.table["min"][unparsed]) and table.table["unit"][unparsed] == NO_UNIT
+    assert table.row(1, "dog") == -1
+    assert table.row(0, "parrot") == -1
+    # A species listed twice under different spellings: the first entry wins.
+    assert table.table["min"][table.row(4, "dog")] == 1.0
+
+def test_best_row(table):
+    assert table.best_row([1, 3, 2], "horse") == (2, table.row(2, "horse"))
+    assert table.best_row([1, 3], "horse") == (1, -1)
+    assert table.best_row([], "horse") == (-1, -1)
+
+def test_doses_vectorized(table):
+    rows = [table.row(0, "dog"), -1, table.row(2, "horse"), table.row(0, "cat")]
+    min_dose, max_dose, units = table.doses(rows, [10.0, 10.0, 500.0, 4.0])
+    assert min_dose[0] == 50.0 and max_dose[0] == 100.0
+    assert np.isnan(min_dose[1]) and np.isnan(max_dose[1]) and units[1] == NO_UNIT
+    assert min_dose[2] == 1000.0 and BASE_UNITS[units[2]] == "mL"
+    assert min_dose[3] == pytest.approx(0.2)
+
+def test_doses_in_source_unit(table):
+    rows = [table.row(0, "cat"), table.row(0, "dog"), table.row(2, "dog"), -1, table.row(2, "horse")]
+    min_dose, max_dose, units = table.doses(rows, [4.0, 10.0, 10.0, 10.0, 500.0], source=True)
+    # 50 mcg/kg for a 4 kg cat is 200 mcg, not 0.2 mg.
+    assert (min_dose[0], max_dose[0], SOURCE_UNITS[units[0]]) == (200.0, 200.0, "mcg")
+    assert (min_dose[1], max_dose[1], SOURCE_UNITS[units[1]]) == (50.0, 100.0, "mg")
+    assert np.isnan(min_dose[2]) and units[2] == NO_UNIT
+    assert np.isnan(min_dose[3]) and units[3] == NO_UNIT
+    assert (min_dose[4], SOURCE_UNITS[units[4]]) == (1000.0, "mL")
+    exact = DoseRateTable([{"dog": "1-5 mcg/kg"}])
+    min_dose, max_dose, _ = exact.doses([0], [1.0], source=True)
+    assert format_amount(min_dose[0], max_dose[0]) == "1-5"
+
+def test_doses_on_empty_table():
+    for source in (False, True):
+        min_dose, _, units = DoseRateTable([]).doses([-1, -1], [1.0, 2.0], source=source)
+        assert np.isnan(min_dose).all() and (units == NO_UNIT).all()
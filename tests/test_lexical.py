@@ -0,0 +1,103 @@
+import math
+from collections import Counter
+
+import pytest
+
+from scripts.lexical import (
+    simple_fulltext_score, progressive_condition_score, InvertedIndex, BM25Index, ConditionTrie,
+    get_fulltext_index,
+)
+from scripts.disease import load_disease_documents
+from benchmarks.common import SAMPLE_QUERIES
+
+EXTRA_DOCS = [
+    "Disease: Canine Oral Plasmacytoma\nSymptoms: oral mass\nClinical Signs: halitosis",
+    "Disease: canine parvovirus\nSymptoms: vomiting diarrhea\nClinical Signs: dehydration",
+    "Disease:   Feline   Asthma  \nSymptoms: cough cough cough",
+    "Symptoms: no disease line here",
+    "disease: lower-case label\nDisease: second label is ignored",
+    "",
+]
+
+@pytest.fixture(scope="module")
+def docs():
+    return list(load_disease_documents()) + EXTRA_DOCS
+
+@pytest.fixture(scope="module")
+def queries(docs):
+    names = [doc.splitlines()[0].split(":", 1)[1] for doc in docs[:60] if doc.startswith("Disease:")]
+    return SAMPLE_QUERIES + names + [
+        "canine", "canine oral", "CANINE ORAL plasmacytoma extra", "canine canine", "feline asthma",
+        "cough", "vomiting diarrhea lethargy", "lower-case", "unknownword", "", "   ",
+    ]
+
+def nonzero(scores: dict) -> dict:
+    return {doc_id: score for doc_id, score in scores.items() if score > 0}
+
+def test_inverted_index_matches_overlap_ratio(docs, queries):
+    index = InvertedIndex(docs)
+    for query in queries:
+        expected = nonzero({doc_id: simple_fulltext_score(query, doc) for doc_id, doc in enumerate(docs)})
+        assert index.score(query) == expected, query
+
+def test_condition_trie_matches_progressive_score(docs, queries):
+    trie = ConditionTrie(docs)
+    for query in queries:
+        if not query.split():
+            # The baseline divides by the number of query tokens.
+            assert trie.score(query) == {}
+            continue
+        expected = nonzero({doc_id: progressive_condition_score(query, doc) for doc_id, doc in enumerate(docs)})
+        assert trie.score(query) == expected, query
+
+def reference_bm25(query: str, docs, k1: float = 1.5, b: float = 0.75) -> dict:
+    """
+    Okapi BM25 computed document by document, normalized by the best score.
+    """
+    tokenized = [doc.lower().split() for doc in docs]
+    avg_length = sum(map(len, tokenized)) / len(tokenized)
+    doc_freqs = Counter(token for tokens in tokenized for token in set(tokens))
+    scores = {}
+    for doc_id, tokens in enumerate(tokenized):
+        term_freqs = Counter(tokens)
+        score = 0.0
+        for term in query.lower().split():
+            tf = term_freqs.get(term, 0)
+            if tf:
+                idf = math.log1p((len(docs) - doc_freqs[term] + 0.5) / (doc_freqs[term] + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avg_length))
+        if score > 0:
+            scores[doc_id] = score
+    best = max(scores.values(), default=1.0)
+    return {doc_id: score / best for doc_id, score in scores.items()}
+
+def test_bm25_matches_reference(docs, queries):
+    pytest.importorskip("scipy")
+    index = BM25Index(docs)
+    for query in queries:
+        expected = reference_bm25(query, docs)
+        scores = index.score(query)
+        assert scores.keys() == expected.keys(), query
+        for doc_id, score in expected.items():
+            assert scores[doc_id] == pytest.approx(score, rel=1e-4, abs=1e-6), query
+
+def test_bm25_top_k_keeps_included_ids(docs):
+    pytest.importorskip("scipy")
+    index = BM25Index(docs)
+    query = "vomiting diarrhea lethargy"
+    expected = reference_bm25(query, docs)
+    ranked = sorted(expected, key=expected.get, reverse=True)
+    top = index.score(query, top_k=3)
+    assert sorted(top.values(), reverse=True) == pytest.approx([expected[doc_id] for doc_id in ranked[:3]], rel=1e-4)
+    outside = ranked[-1]
+    with_included = index.score(query, top_k=3, include_ids=[outside])
+    assert with_included[outside] == pytest.approx(expected[outside], rel=1e-4)
+    assert len(with_included) == 4
+
+def test_lexical_index_cached_per_list(docs):
+    doc_list = list(docs)
+    index = get_fulltext_index(doc_list)
+    assert get_fulltext_index(doc_list) is index
+    doc_list.append("Disease: new")
+    rebuilt = get_fulltext_index(doc_list)
+    assert rebuilt is not index and rebuilt.num_docs == len(doc_list)
@@ -0,0 +1,33 @@
+import pytest
+
+from scripts.router import get_router
+from benchmarks.bench_router import REFERENCE_MODE, query_corpus, parity_mismatches
+
+# Punctuation and spacing around keywords.
+EDGE_QUERIES = [
+    "dose rate?", "(dose rate)", "dose-rate", "dose/rate", "dose;rate", "dose rate...",
+    "mechanism of action: ivermectin", "symptoms,clinical signs", "tradename's",
+    "brand  name", "brand\tname", "\"dosage\"", "dosage.", "e.g. dosage", "’rate dose",
+    "10-kg dog dose rate", "line of treatment—management", "",
+]
+
+@pytest.fixture(scope="module")
+def reference():
+    pytest.importorskip("spacy")
+    try:
+        return get_router(REFERENCE_MODE)
+    except OSError:
+        pytest.skip("en_core_web_sm is not installed")
+
+def test_tokenizer_router_matches_full_pipeline(reference):
+    queries = query_corpus() + EDGE_QUERIES
+    assert parity_mismatches(reference, get_router("tokenizer"), queries) == []
+
+def test_overlapping_keywords_count_separately():
+    pytest.importorskip("spacy")
+    assert get_router("tokenizer").counts("Mechanism of action") == {"pharma": 2, "clinical": 0, "disease": 0}
+    assert get_router("tokenizer").route("canine parvovirus") == "clinical"
+
+def test_unknown_router():
+    with pytest.raises(ValueError):
+        get_router("regex")
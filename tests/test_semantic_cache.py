@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+from scripts.semantic_cache import SemanticAnswerCache, query_entities
+
+SCOPE = ("pharma", "dose", 7, "Ollama")
+
+def test_finds_same_scope_answer_behind_closer_ones():
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=768).astype('float32')
+    cache = SemanticAnswerCache(threshold=0.9)
+    for doc_id in range(20):
+        cache.store(query + rng.normal(0, 0.001, 768), ("pharma", "dose", 100 + doc_id, "Ollama"), "other")
+    cache.store(query + rng.normal(0, 0.05, 768), SCOPE, "answer")
+    assert cache.lookup(query, SCOPE) == "answer"
+    assert cache.lookup(query, ("pharma", "dose", 8, "Ollama")) is None
+    assert cache.lookup(-query, SCOPE) is None
+
+def test_evicts_least_recently_used():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(3, 64)).astype('float32')
+    cache = SemanticAnswerCache(max_size=2)
+    cache.store(vectors[0], SCOPE, "first")
+    cache.store(vectors[1], ("disease", "symptoms", 1, "Gemini"), "second")
+    assert cache.lookup(vectors[0], SCOPE) == "first"
+    cache.store(vectors[2], ("disease", "symptoms", 2, "Gemini"), "third")
+    assert cache.lookup(vectors[1], ("disease", "symptoms", 1, "Gemini")) is None
+    assert cache.lookup(vectors[0], SCOPE) == "first"
+    assert cache.stats()["scopes"] == 2
+
+def test_species_and_numbers_split_scope():
+    assert query_entities("Meloxicam dose for cats, 4 kg") == query_entities("4.0 kg feline meloxicam dose")
+    assert query_entities("meloxicam dose for cats") != query_entities("meloxicam dose for dogs")
+    assert query_entities("meloxicam dose for a 4 kg dog") != query_entities("meloxicam dose for a 40 kg dog")
+    vector = np.random.default_rng(2).normal(size=64).astype('float32')
+    cache = SemanticAnswerCache()
+    cache.store(vector, SCOPE + (query_entities("meloxicam dose for cats"),), "cat answer")
+    assert cache.lookup(vector, SCOPE + (query_entities("meloxicam dose for dogs"),)) is None
+    assert cache.lookup(vector, SCOPE + (query_entities("meloxicam dosing in a kitten"),)) == "cat answer"
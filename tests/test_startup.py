@@ -0,0 +1,25 @@
+import threading
+
+from scripts.startup import StartupLoader
+
+def broken():
+    raise RuntimeError("no model file")
+
+def test_failed_component_is_not_pending():
+    release = threading.Event()
+    loader = StartupLoader(max_workers=3)
+    loader.register("encoder", lambda: "encoder")
+    loader.register("router", broken)
+    loader.register("catalog", release.wait)
+    loader.start(background=True)
+    loader._events["router"].wait(5)
+    loader._events["encoder"].wait(5)
+    assert loader.failed("encoder", "router") == {"router": "RuntimeError: no model file"}
+    assert loader.pending("encoder", "router") == []
+    assert loader.pending() == ["catalog"]
+    assert not loader.ready("router") and loader.ready("encoder")
+    release.set()
+    loader._events["catalog"].wait(5)
+    status = loader.status()
+    assert status["loading"] == [] and status["failed"] == ["router"] and not status["ready"]
+    assert status["components"]["router"]["status"] == "failed"
@@ -68,6 +68,45 @@ function ChatWindow({ onClose }) {
     setMessages(prev => [...prev, { sender, text, matches, isHTML }]);
   };
 
+  // Replace fields of the last message (used while a streamed answer arrives).
+  const updateLastMessage = (changes) => {
+    setMessages(prev => {
+      const updated = [...prev];
+      updated[updated.length - 1] = { ...updated[updated.length - 1], ...changes };
+      return updated;
+    });
+  };
+
+  // Read a text/event-stream response and call onEvent(event, data) for every event.
+  // The API sends JSON in each data field.
+  const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        let data = "";
+        rawEvent.split("\n").forEach(line => {
+          if (line.startsWith("event:")) {
+            event = line.slice(6).trim();
+          } else if (line.startsWith("data:")) {
+            data += line.slice(5).trim();
+          }
+        });
+        if (data) {
+          onEvent(event, JSON.parse(data));
+        }
+      }
+    }
+  };
+
   // Recursive helper to format arrays and objects.
   const formatValue = (value) => {
     if (Array.isArray(value)) {
@@ -243,6 +282,45 @@ function ChatWindow({ onClose }) {
     const endpointURL = categoryKey ? `/${categoryKey}/${chatState.selectedAction}` : '/chat';
     const fullURL = `http://192.168.29.105:7860${endpointURL}`;
     
+    // Category endpoints stream: the reference arrives first, then the answer token by token.
+    if (categoryKey) {
+      try {
+        const response = await fetch(`${fullURL}/stream`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            query: message,
+            provider: chatState.selectedProvider,
+            endpoint: chatState.selectedAction
+          })
+        });
+        if (!response.ok || !response.body) {
+          throw new Error(`Request failed with status ${response.status}`);
+        }
+        let text = "";
+        await readEventStream(response, (event, data) => {
+          if (event === "reference") {
+            setLoading(false);
+            appendMessage("bot", "", data.reference || null, false);
+          } else if (event === "token") {
+            text += data.token;
+            updateLastMessage({ text });
+          } else if (event === "error") {
+            text += `\nError: ${data.error}`;
+            updateLastMessage({ text });
+          } else if (event === "done") {
+            updateLastMessage({ text: formatResponse(text) });
+          }
+        });
+        setLoading(false);
+        setChatState(prev => ({ ...prev, conversationState: "selectAction" }));
+      } catch (error) {
+        setLoading(false);
+        appendMessage("bot", "Error: " + error.message);
+      }
+      return;
+    }
+
     try {
       const response = await fetch(fullURL, {
         method: 'POST',